@@ -6,7 +6,8 @@ from ml.src.models import versus, MahjongNN
 from ml.src.models.handle_device import get_device
 from ml.src.models.mahjong_nn import MahjongNN
 from game.src.core.player import Player
-from ml.src.data_processing import extract_datapoints, refine_data
+from game.src.core.heuristic_player import HeuristicPlayer
+from ml.src.data_processing import extract_datapoints, refine_data, self_play_datapoints
 
 if __name__ == "__main__":
     device = get_device()
@@ -16,6 +17,7 @@ if __name__ == "__main__":
         print('''
 Select mode:
 data [db_year] [raw_data_filename] [how_many_matches] [chunk_size] - extract datapoints
+selfplay [raw_data_filename] [how_many_matches] [chunk_size] [init_seed] - datapoints from the model playing itself
 process [raw_data_filename] [processed_data_filename] - refine data
 init [num_layers] [hidden_size]
 train [processed_data_filename]
@@ -40,6 +42,24 @@ quit
                 raw_data_filepath = os.path.join(os.getcwd(), "ml", "data", "raw", raw_data_filename)
                 extract_datapoints(db_year + ".db", raw_data_filepath, how_many=how_many, chunk_size=chunk_size)
 
+            case "selfplay":
+                if len(user_input) != 5:
+                    print("Expecting 4 arguments for selfplay, got {}.".format(len(user_input) - 1))
+                    continue
+                if model is None:
+                    print("Init or load a model first.")
+                    continue
+
+                raw_data_filename = user_input[1]
+                how_many = int(user_input[2])
+                chunk_size = int(user_input[3])
+                init_seed = int(user_input[4])
+
+                raw_data_filepath = os.path.join(os.getcwd(), "ml", "data", "raw", raw_data_filename)
+                competitors = [Player(is_human=False, model=model) for _ in range(4)]
+                self_play_datapoints(competitors, raw_data_filepath, how_many=how_many, chunk_size=chunk_size,
+                                     init_seed=init_seed)
+
             case "process":
                 if len(user_input) != 3:
                     print("Expecting 2 arguments for init, got {}.".format(len(user_input) - 1))
@@ -98,12 +118,17 @@ quit
                 names = []
                 i = 0
                 while i < 4:
-                    input2 = input(f"Load competitor {i}: [filename] ").split(' ')
+                    input2 = input(f"Load competitor {i}: [filename | heuristic] ").split(' ')
                     if len(input2) != 1:
                         print("Expecting 1 argument for load for versus, got {}.".format(len(input2)))
                         continue
                     filename = input2[0]
-                    competitors.append(Player(is_human=False, model=MahjongNN.from_file(filename, torch.device("cpu"))))
+                    if filename == "heuristic":
+                        competitors.append(HeuristicPlayer())
+                    else:
+                        competitors.append(
+                            Player(is_human=False, model=MahjongNN.from_file(filename, torch.device("cpu")))
+                        )
                     names.append(filename)
                     i += 1
 
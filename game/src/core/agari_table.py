@@ -0,0 +1,118 @@
+import mahjong.constants as mc
+
+
+ORPHAN_INDICES = mc.TERMINAL_INDICES + mc.HONOR_INDICES
+
+
+def _build_suit_tables():
+    # every count vector of a single suit that splits into sets, optionally with one pair
+    sets = [tuple(3 if i == r else 0 for i in range(9)) for r in range(9)] + \
+        [tuple(1 if r <= i <= r + 2 else 0 for i in range(9)) for r in range(7)]
+    patterns: dict[tuple[int, ...], bool] = {}  # counts -> has pair
+    level = {(0,) * 9}
+    for _ in range(5):
+        next_level = set()
+        for counts in level:
+            patterns[counts] = False
+            for r in range(9):
+                if counts[r] <= 2:
+                    patterns[counts[:r] + (counts[r] + 2,) + counts[r + 1:]] = True
+            for meld in sets:
+                new_counts = tuple(c + m for c, m in zip(counts, meld))
+                if max(new_counts) <= 4:
+                    next_level.add(new_counts)
+        level = next_level
+
+    # one tile short of a complete pattern -> (has pair once completed, ranks completing it)
+    waits: dict[tuple[int, ...], tuple[bool, list[int]]] = {}
+    for counts, has_pair in patterns.items():
+        for r in range(9):
+            if counts[r]:
+                short = counts[:r] + (counts[r] - 1,) + counts[r + 1:]
+                waits.setdefault(short, (has_pair, []))[1].append(r)
+
+    return (
+        {bytes(counts): has_pair for counts, has_pair in patterns.items()},
+        {bytes(counts): (has_pair, tuple(ranks)) for counts, (has_pair, ranks) in waits.items()},
+    )
+
+
+SUIT_PATTERNS, SUIT_WAITS = _build_suit_tables()
+
+
+def is_agari(closed34, has_melds=False) -> bool:
+    # closed34 holds only the concealed part of the hand, melds are already complete sets
+    pairs = 0
+    for suit_start in (0, 9, 18):
+        has_pair = SUIT_PATTERNS.get(bytes(closed34[suit_start:suit_start + 9]))
+        if has_pair is None:
+            return _is_special_agari(closed34, has_melds)
+        pairs += has_pair
+    for i in range(27, 34):
+        count = closed34[i]
+        if count == 2:
+            pairs += 1
+        elif count == 1 or count == 4:
+            return _is_special_agari(closed34, has_melds)
+    return pairs == 1 or _is_special_agari(closed34, has_melds)
+
+
+def _is_special_agari(closed34, has_melds):
+    if has_melds:
+        return False
+    key = bytes(closed34)
+    # seven pairs
+    if key.count(2) == 7:
+        return True
+    # thirteen orphans
+    if sum(key) != 14:
+        return False
+    product = 1
+    for i in ORPHAN_INDICES:
+        product *= key[i]
+    return product == 2
+
+
+def agari_waits(closed34, has_melds=False) -> tuple[int, ...]:
+    # split the hand into components (3 suits, 7 honors) and look each one up once
+    completes = []  # has pair, or None if the component isn't complete
+    waits = []  # (has pair once completed, tiles completing it)
+    for suit_start in (0, 9, 18):
+        key = bytes(closed34[suit_start:suit_start + 9])
+        completes.append(SUIT_PATTERNS.get(key))
+        has_pair, ranks = SUIT_WAITS.get(key, (False, ()))
+        waits.append((has_pair, [suit_start + r for r in ranks]))
+    for i in range(27, 34):
+        count = closed34[i]
+        completes.append({0: False, 2: True, 3: False}.get(count))
+        waits.append({1: (True, [i]), 2: (False, [i])}.get(count, (False, [])))
+
+    result = set()
+    incomplete = [c for c, has_pair in enumerate(completes) if has_pair is None]
+    if len(incomplete) <= 1:
+        pairs = sum(bool(has_pair) for has_pair in completes)
+        for c in (incomplete or range(len(completes))):
+            pairs_elsewhere = pairs - bool(completes[c])
+            has_pair, tiles = waits[c]
+            if has_pair + pairs_elsewhere == 1:
+                result.update(tiles)
+
+    if not has_melds:
+        result.update(_special_waits(closed34))
+    return tuple(sorted(result))
+
+
+def _special_waits(closed34):
+    # seven pairs
+    singles = [i for i in range(34) if closed34[i] == 1]
+    if len(singles) == 1 and sum(count == 2 for count in closed34) == 6:
+        return singles
+    # thirteen orphans
+    if sum(closed34) != 13 or any(closed34[i] for i in range(34) if i not in ORPHAN_INDICES):
+        return []
+    missing = [i for i in ORPHAN_INDICES if not closed34[i]]
+    if not missing:
+        return ORPHAN_INDICES
+    if len(missing) == 1:
+        return missing
+    return []
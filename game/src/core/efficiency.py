@@ -0,0 +1,198 @@
+import numpy as np
+from functools import lru_cache
+from typing import NamedTuple
+from mahjong import shanten
+
+from game.src.core.agari_table import ORPHAN_INDICES
+
+
+SUIT_SLICES = (slice(0, 9), slice(9, 18), slice(18, 27), slice(27, 34))
+IS_ORPHAN = tuple(i in ORPHAN_INDICES for i in range(34))
+ORPHANS = tuple(ORPHAN_INDICES)
+
+
+# Shanten after each discard, the tiles that would lower it and how many of them the seat hasn't seen
+class DiscardEfficiency(NamedTuple):
+    discards: np.ndarray  # (n,) tile id34 of every distinct tile the hand can discard
+    shanten: np.ndarray  # (n,) shanten of the hand left after that discard
+    improving: np.ndarray  # (n, 34) bool, tiles lowering that shanten
+    live: np.ndarray  # (n,) unseen copies of the improving tiles
+
+
+class HandEfficiency(NamedTuple):
+    shanten: int
+    improving: np.ndarray  # (34,) bool
+    live: int
+
+
+def _pareto(options):
+    return frozenset(
+        (s, p, h) for s, p, h in options
+        if not any(s2 >= s and p2 >= p and h2 == h and (s2, p2) != (s, p) for s2, p2, h2 in options)
+    )
+
+
+# Process-wide tile efficiency engine: suit splits are cached per suit, whole hands per their 4 suit keys.
+# Shanten is counted as the engine counts it (mahjong.shanten), for the closed part of a hand plus its melds.
+class EfficiencyService:
+    def __init__(self, maxsize=1 << 18):
+        self.calculator = shanten.Shanten()
+        self._suit = lru_cache(maxsize=maxsize)(self._suit_uncached)
+        self._regular = lru_cache(maxsize=maxsize)(self._regular_uncached)
+        self._combine = lru_cache(maxsize=maxsize)(self._combine_uncached)
+        self._best = lru_cache(maxsize=maxsize)(self._best_uncached)
+        self._improving_draws = lru_cache(maxsize=maxsize)(self._improving_draws_uncached)
+
+    def _suit_uncached(self, key: bytes, sequences: bool):
+        # every (sets, partial sets, pair) split of one suit, only the ones not beaten on both sets and partial sets:
+        # the ways to use the first tile kind held, each joined with the (cached) splits of what remains
+        i = next((i for i, count in enumerate(key) if count), None)
+        if i is None:
+            return frozenset({(0, 0, 0)})
+        counts = bytearray(key)
+        options = set()
+
+        def split(removed, sets, partials, pair):
+            for rank, n in removed:
+                counts[rank] -= n
+            rest = self._suit(bytes(counts), sequences)
+            for rank, n in removed:
+                counts[rank] += n
+            options.update((s + sets, p + partials, h + pair) for s, p, h in rest if h + pair <= 1)
+
+        if counts[i] >= 3:
+            split(((i, 3),), 1, 0, 0)
+        if sequences and i < 7 and counts[i + 1] and counts[i + 2]:
+            split(((i, 1), (i + 1, 1), (i + 2, 1)), 1, 0, 0)
+        if counts[i] >= 2:
+            split(((i, 2),), 0, 0, 1)
+            split(((i, 2),), 0, 1, 0)
+        for gap in ((1, 2) if sequences else ()):
+            if i + gap < 9 and counts[i + gap]:
+                split(((i, 1), (i + gap, 1)), 0, 1, 0)
+        split(((i, 1),), 0, 0, 0)
+        return _pareto(options)
+
+    def _regular_uncached(self, keys: tuple[bytes, bytes, bytes, bytes], n_melds: int):
+        if any(b"\x04" in key for key in keys):
+            # waits on a tile held four times don't count, splits alone can't tell
+            return self.calculator.calculate_shanten_for_regular_hand(list(b"".join(keys)))
+        combined = frozenset({(n_melds, 0, 0)})
+        for suit_id, key in enumerate(keys[:3]):
+            combined = self._combine(combined, self._suit(key, True))
+        return self._best(combined, self._suit(keys[3], False))
+
+    def _combine_uncached(self, options: frozenset, other: frozenset):
+        # splits of two groups of suits together, melds counting as finished sets
+        return _pareto({
+            (min(s + s2, 4), min(p + p2, 4), h + h2)
+            for s, p, h in options for s2, p2, h2 in other if h + h2 <= 1
+        })
+
+    def _best_uncached(self, options: frozenset, other: frozenset):
+        return min(
+            8 - 2 * min(s + s2, 4) - min(p + p2, 4 - min(s + s2, 4)) - h - h2
+            for s, p, h in options for s2, p2, h2 in other if h + h2 <= 1
+        )
+
+    def shanten(self, closed34, n_melds=0) -> int:
+        counts = np.asarray(closed34).tolist()
+        result = self._regular(tuple(bytes(counts[suit]) for suit in SUIT_SLICES), n_melds)
+        if n_melds == 0:
+            result = min(result, self._special_shanten(*self._special_stats(counts)))
+        return result
+
+    @staticmethod
+    def _special_stats(counts: list[int]):
+        # pairs, thirteen orphans kinds, thirteen orphans pair
+        orphans = [counts[i] for i in ORPHANS]
+        return len(counts) - counts.count(0) - counts.count(1), len(orphans) - orphans.count(0), max(orphans) >= 2
+
+    @staticmethod
+    def _special_shanten(pairs, orphans, orphan_pair):
+        # seven pairs and thirteen orphans, closed hands only
+        return min(6 - pairs, 13 - orphans - orphan_pair)
+
+    def hand_efficiency(self, closed34, n_melds, hidden34) -> HandEfficiency:
+        # for a hand waiting to draw: its shanten, the draws lowering it and their unseen copies
+        counts = np.asarray(closed34).tolist()
+        keys = [bytes(counts[suit]) for suit in SUIT_SLICES]
+        result = self._regular(tuple(keys), n_melds)
+        special = None
+        if n_melds == 0:
+            special = self._special_stats(counts)
+            result = min(result, self._special_shanten(*special))
+
+        # splits of the other three suits, so the draws of a suit only add the splits of that suit
+        suits = [self._suit(key, suit_id < 3) for suit_id, key in enumerate(keys)]
+        prefix = [frozenset({(n_melds, 0, 0)})]
+        for suit in suits[:3]:
+            prefix.append(self._combine(prefix[-1], suit))
+        has_four = any(b"\x04" in key for key in keys)
+
+        improving = np.zeros(34, dtype=np.bool_)
+        suffix = suits[3]
+        for suit_id in (3, 2, 1, 0):
+            rest = prefix[3] if suit_id == 3 else self._combine(prefix[suit_id], suffix)
+            if suit_id < 3:
+                suffix = self._combine(suits[suit_id], suffix)
+            for rank in self._improving_draws(rest, keys[suit_id], suit_id < 3, result):
+                tile_id34 = suit_id * 9 + rank
+                if has_four or counts[tile_id34] == 3:
+                    # splits never count more than the engine does, but waits on a tile held four times
+                    # only count there, so these few draws are checked against the engine's count
+                    counts[tile_id34] += 1
+                    draw_keys = keys.copy()
+                    draw_keys[suit_id] = bytes(counts[SUIT_SLICES[suit_id]])
+                    counts[tile_id34] -= 1
+                    improving[tile_id34] = self._regular(tuple(draw_keys), n_melds) < result
+                else:
+                    improving[tile_id34] = True
+
+        if special is not None and self._special_shanten(*special) <= result:
+            # a draw lowers seven pairs or thirteen orphans by at most one
+            pairs, orphans, orphan_pair = special
+            for tile_id34, count in enumerate(counts):
+                if count < 4 and not improving[tile_id34]:
+                    orphan = IS_ORPHAN[tile_id34]
+                    improving[tile_id34] = self._special_shanten(
+                        pairs + (count == 1), orphans + (orphan and count == 0), orphan_pair or (orphan and count == 1)
+                    ) < result
+        return HandEfficiency(result, improving, int(np.asarray(hidden34)[improving].sum()))
+
+    def _improving_draws_uncached(self, rest: frozenset, key: bytes, sequences: bool, result: int):
+        # ranks of one suit whose draw lowers the regular shanten of its splits below result
+        ranks = []
+        for rank, count in enumerate(key):
+            if count < 4:
+                draw_key = key[:rank] + bytes((count + 1,)) + key[rank + 1:]
+                if self._best(rest, self._suit(draw_key, sequences)) < result:
+                    ranks.append(rank)
+        return tuple(ranks)
+
+    def discard_efficiency(self, closed34, n_melds, hidden34) -> DiscardEfficiency:
+        # every discard candidate of a hand holding a drawn tile, at once
+        counts = np.array(closed34, dtype=np.int8)
+        discards = np.flatnonzero(counts)
+        result = np.empty(len(discards), dtype=np.int8)
+        improving = np.zeros((len(discards), 34), dtype=np.bool_)
+        for i, tile_id34 in enumerate(discards):
+            counts[tile_id34] -= 1
+            result[i], improving[i], _ = self.hand_efficiency(counts, n_melds, hidden34)
+            counts[tile_id34] += 1
+        live = improving.astype(np.int16) @ np.asarray(hidden34, dtype=np.int16)
+        return DiscardEfficiency(discards, result, improving, live)
+
+    def stats(self):
+        return {
+            "suits": self._suit.cache_info(), "hands": self._regular.cache_info(),
+            "combined": self._combine.cache_info(), "best": self._best.cache_info(),
+            "draws": self._improving_draws.cache_info(),
+        }
+
+    def clear(self):
+        for cache in (self._suit, self._regular, self._combine, self._best, self._improving_draws):
+            cache.cache_clear()
+
+
+efficiency_service = EfficiencyService()
@@ -0,0 +1,157 @@
+import numpy as np
+
+from game.src.core.tile import Tile
+from game.src.core.mahjong_enums import MoveType
+from ml.src.data_structures import MoveData, RoundData, MatchData
+
+
+# Append-only binary game records: a file is a plain array of fixed-width records, one match after another.
+# kind is a MoveType value for moves, or one of the structural kinds below.
+RECORD_DTYPE = np.dtype([("kind", np.uint8), ("seat", np.int8), ("tile", np.int16), ("value", np.int32)])
+
+
+class RecordKind:
+    MATCH_START = 16  # value: prevalent wind of the match (mahjong.constants wind)
+    MATCH_END = 17
+    ROUND_START = 18  # seat: dealer, value: non repeat round number
+    ROUND_END = 19  # value: dealer won
+    DEAL = 20  # seat, tile: starting hand tile
+    DORA = 21  # tile: revealed dora indicator
+    URADORA = 22  # tile: uradora indicator
+    SCORE = 23  # seat, value: score, 4 after ROUND_START (before the round) and 4 after ROUND_END
+    MATCH_ID = 24  # value: index of the match among those played together, right after MATCH_START
+    SEED = 25  # value: 32 bits of the wall seed, lowest first, as many as the seed needs, after MATCH_START
+    # moves: CHI/PON value holds the meld tiles packed 8 bits each, RON/TSUMO value the seat that dealt in,
+    # DRAW with tile -1 is an abortive draw (nine orphans)
+
+
+def pack_tiles(tiles: list[Tile]):
+    return sum(tile.id136() << (8 * i) for i, tile in enumerate(tiles))
+
+
+def unpack_tiles(value, n):
+    return tuple(Tile.of((value >> (8 * i)) & 0xFF) for i in range(n))
+
+
+# Records of one match, kept in memory until the match is over so lockstep matches don't interleave
+class GameRecordBuffer:
+    def __init__(self, capacity=1024):
+        self.records = np.empty(capacity, dtype=RECORD_DTYPE)
+        self.n = 0
+
+    def write(self, kind, seat=-1, tile=-1, value=0):
+        if self.n == len(self.records):
+            self.records = np.concatenate((self.records, np.empty(len(self.records), dtype=RECORD_DTYPE)))
+        self.records[self.n] = (kind, seat, tile, value)
+        self.n += 1
+
+    def write_seed(self, seed):
+        while True:
+            low = seed & 0xFFFFFFFF
+            self.write(RecordKind.SEED, value=low - (1 << 32) if low >= 1 << 31 else low)
+            seed >>= 32
+            if not seed:
+                break
+
+    def view(self):
+        return self.records[:self.n]
+
+
+class GameRecordWriter:
+    def __init__(self, path):
+        self.file = open(path, "ab")
+        self.matches_written = 0
+
+    def write_match(self, buffer: GameRecordBuffer):
+        buffer.view().tofile(self.file)
+        self.matches_written += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class GameRecordReader:
+    def __init__(self, path):
+        self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r")
+        starts = np.flatnonzero(self.records["kind"] == RecordKind.MATCH_START)
+        ends = np.flatnonzero(self.records["kind"] == RecordKind.MATCH_END) + 1
+        # matches cut off by an interrupted writer are left out
+        self.match_bounds = []
+        next_starts = np.append(starts[1:], len(self.records))
+        for start, next_start, end_id in zip(starts, next_starts, np.searchsorted(ends, starts, side="right")):
+            if end_id < len(ends) and ends[end_id] <= next_start:
+                self.match_bounds.append((int(start), int(ends[end_id])))
+
+    def __len__(self):
+        return len(self.match_bounds)
+
+    def match_records(self, i):
+        start, stop = self.match_bounds[i]
+        return self.records[start:stop]
+
+    def match_data(self, i) -> MatchData:
+        # in the form ReplayRound replays
+        match_data = MatchData()
+        round_data: RoundData | None = None
+        scores_seen = 0
+        seed_words = 0
+        for kind, seat, tile, value in self.match_records(i).tolist():
+            match kind:
+                case RecordKind.MATCH_START:
+                    match_data.prevalent_wind = value
+                case RecordKind.MATCH_ID:
+                    match_data.match_id = value
+                case RecordKind.SEED:
+                    match_data.seed = (match_data.seed or 0) | (value & 0xFFFFFFFF) << (32 * seed_words)
+                    seed_words += 1
+                case RecordKind.ROUND_START:
+                    round_data = RoundData(seat, None)
+                    match_data.round_data.append(round_data)
+                    scores_seen = 0
+                case RecordKind.DEAL:
+                    round_data.init_hands[seat].append(Tile.of(tile))
+                case RecordKind.DORA:
+                    if round_data.initial_dora is None:
+                        round_data.initial_dora = Tile.of(tile)
+                    else:
+                        round_data.moves[-1].dora_revealed_ind = Tile.of(tile)
+                case RecordKind.URADORA:
+                    round_data.uradora.append(Tile.of(tile))
+                case RecordKind.SCORE:
+                    if scores_seen < 4:
+                        round_data.score_before[seat] = value
+                    else:
+                        round_data.score_change[seat] = value - round_data.score_before[seat]
+                    scores_seen += 1
+                case RecordKind.MATCH_END | RecordKind.ROUND_END:
+                    pass
+                case _:
+                    round_data.moves.append(self.move_data(kind, seat, tile, value))
+                    if kind == MoveType.RON.value:
+                        round_data.dealt_in = value
+        return match_data
+
+    @staticmethod
+    def move_data(kind, seat, tile, value):
+        move = MoveData()
+        move.move_type = MoveType(kind)
+        move.player_id = seat
+        move.tile = Tile.of(tile) if tile >= 0 else None
+        if move.move_type in (MoveType.CHI, MoveType.PON):
+            move.base = unpack_tiles(value, 3)
+        elif move.move_type == MoveType.KAN:
+            move.base = tuple(Tile.of(tile // 4 * 4 + i) for i in range(4))
+        return move
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.match_data(i)
@@ -0,0 +1,57 @@
+# Hands packed into a single int, 3 bits per tile id34 holding its count (0-4), suits in consecutive fields.
+# Adding or removing a tile never carries into the next field, and the int is a compact hashable hand key.
+FIELD_BITS = 3
+FIELD_MASK = (1 << FIELD_BITS) - 1
+LOW_BITS = sum(1 << FIELD_BITS * i for i in range(34))  # lowest bit of every field
+FOUR_BITS = LOW_BITS << 2  # only a count of 4 sets the highest bit of a field
+
+CHI_SHAPES = ((-2, -1), (-1, 1), (1, 2))
+
+
+def tile_bit(tile_id34):
+    # added to / subtracted from a hand to draw / discard one copy of the tile
+    return 1 << FIELD_BITS * tile_id34
+
+
+def count_of(bits, tile_id34):
+    return bits >> FIELD_BITS * tile_id34 & FIELD_MASK
+
+
+def from_counts(counts):
+    return sum(int(count) << FIELD_BITS * i for i, count in enumerate(counts))
+
+
+def occupied(bits):
+    # lowest bit of every field holding at least one tile
+    return (bits | bits >> 1 | bits >> 2) & LOW_BITS
+
+
+def has_four(bits):
+    return bool(bits & FOUR_BITS)
+
+
+def _build_chi_masks():
+    # for every tile id34 and chi shape: occupied() bits the two other tiles need, 0 if the shape leaves the suit
+    masks = []
+    for tile_id34 in range(34):
+        tile_masks = []
+        for shape in CHI_SHAPES:
+            if tile_id34 < 27 and all(0 <= tile_id34 % 9 + delta < 9 for delta in shape):
+                tile_masks.append(sum(tile_bit(tile_id34 + delta) for delta in shape))
+            else:
+                tile_masks.append(0)
+        masks.append(tuple(tile_masks))
+    return tuple(masks)
+
+
+CHI_MASKS = _build_chi_masks()
+
+
+def chi_bits(bits, tile_id34):
+    # bit i set if the hand can chi tile_id34 in CHI_SHAPES[i]
+    held = occupied(bits)
+    result = 0
+    for i, mask in enumerate(CHI_MASKS[tile_id34]):
+        if mask and held & mask == mask:
+            result |= 1 << i
+    return result
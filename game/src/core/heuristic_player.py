@@ -0,0 +1,76 @@
+import numpy as np
+
+from game.src.core.player import Player
+from game.src.core.mahjong_enums import MoveType
+from game.src.core.agari_table import ORPHAN_INDICES
+
+
+DRAGONS = (31, 32, 33)
+WIND_OFFSET = 27  # tile id34 of the east wind
+
+
+# Rule based opponent that needs no model: discards for tile efficiency, riichis, kans and wins whenever it can,
+# pons only value honors and folds against riichi while far from ready
+class HeuristicPlayer(Player):
+    def __init__(self, fold_shanten=2, abort_shanten=3):
+        super().__init__(is_human=False, model=None)
+        self.fold_shanten = fold_shanten  # at this shanten or worse, discard safe tiles against a riichi
+        self.abort_shanten = abort_shanten  # at this shanten or worse, take the nine orphans draw
+
+    def decide(self, rnd, requests):
+        discards = np.zeros(len(requests), dtype=np.intp)
+        which_chi = np.zeros(len(requests), dtype=np.intp)
+        actions = np.zeros(len(requests), dtype=np.intp)
+        for i, (p, possible_calls) in enumerate(requests):
+            if MoveType.DISCARD in possible_calls:
+                discards[i] = self.choose_discard(rnd, p, possible_calls)
+                actions[i] = MoveType.DISCARD.value
+            else:
+                actions[i] = self.choose_action(rnd, p, possible_calls).value
+        return rnd.choose_moves(requests, (discards, which_chi, actions))
+
+    def choose_action(self, rnd, p, possible_calls: list[MoveType]):
+        for call in (MoveType.TSUMO, MoveType.RON, MoveType.RIICHI):
+            if call in possible_calls:
+                return call
+        if MoveType.DRAW in possible_calls and self.is_abort_worth(rnd, p):
+            return MoveType.DRAW
+        if MoveType.KAN in possible_calls and not rnd.hand_in_riichi[p]:
+            # a kan on a discard comes with a pon and opens the hand, only worth it for value honors too
+            if MoveType.PON not in possible_calls or self.is_value_honor(rnd, p, rnd.tile.id34()):
+                return MoveType.KAN
+        if MoveType.PON in possible_calls and self.is_value_honor(rnd, p, rnd.tile.id34()):
+            return MoveType.PON
+        return MoveType.PASS
+
+    def is_abort_worth(self, rnd, p):
+        # only a real nine orphans hand, and one that is still far from ready
+        return np.count_nonzero(rnd.closed_hand_counts[p][ORPHAN_INDICES]) >= 9 and \
+            rnd.get_shanten(p) >= self.abort_shanten
+
+    @staticmethod
+    def is_value_honor(rnd, p, tile_id34):
+        return tile_id34 in DRAGONS or \
+            tile_id34 in (WIND_OFFSET + rnd.seat_wind[p], WIND_OFFSET + rnd.prevalent_wind)
+
+    def choose_discard(self, rnd, p, possible_calls: list[MoveType]):
+        return self.rank_discards(rnd, p, possible_calls)[0]
+
+    def rank_discards(self, rnd, p, possible_calls: list[MoveType]):
+        # tile id34 of every discard it would consider, best first
+        legal = rnd.legal_masks(p, possible_calls)[0]
+        efficiency = rnd.discard_efficiency(p)
+        candidates = legal[efficiency.discards]
+
+        riichi = [q for q in range(4) if q != p and rnd.hand_in_riichi[q]]
+        if riichi and efficiency.shanten[candidates].min() >= self.fold_shanten:
+            # tiles every riichi seat has discarded itself can't be ronned by them
+            safe = (rnd.discard_orders[riichi][:, efficiency.discards] > 0).all(axis=0)
+            if (candidates & safe).any():
+                candidates &= safe
+
+        # lowest shanten, then most live improving tiles, then honors and terminals first
+        rank = efficiency.discards % 9
+        edge = np.where(efficiency.discards >= 27, 0, np.where((rank == 0) | (rank == 8), 1, 2))
+        order = np.lexsort((edge, -efficiency.live, efficiency.shanten))
+        return efficiency.discards[order[candidates[order]]]
@@ -0,0 +1,118 @@
+import json
+import inspect
+import numpy as np
+from time import perf_counter
+from functools import wraps
+
+from game.src.core.round import Round
+
+
+# Opt-in timing of Round internals: attach() wraps methods on the round instance only,
+# so rounds without a profiler run the plain class methods with no overhead
+class RoundProfiler:
+    HANDLERS = (
+        "handle_draw_tile", "handle_discard_tile", "handle_tile_discarded", "handle_after_kan",
+        "handle_round_draw", "handle_wall_exhausted", "handle_winner",
+    )
+    SECTIONS = (
+        "get_shanten", "set_riichi_discards", "update_waits",  # shanten
+        "get_hand_result", "get_wait_results",  # hand value
+        "decide_many", "load_features", "load_masks", "predict", "choose_moves",  # decisions, model inference
+    )
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.durations: dict[str, list[float]] = {}
+        self.trace_events = []
+        self.rounds_attached = 0
+        self.start = perf_counter()
+
+    def attach(self, rnd: Round):
+        tid = self.rounds_attached
+        self.rounds_attached += 1
+        for name in RoundProfiler.HANDLERS + RoundProfiler.SECTIONS:
+            method = getattr(rnd, name)
+            if inspect.isgeneratorfunction(method):
+                setattr(rnd, name, self.timed_generator(name, method, tid))
+            else:
+                setattr(rnd, name, self.timed(name, method, tid))
+        return rnd
+
+    def record(self, name, duration):
+        self.durations.setdefault(name, []).append(duration)
+
+    def record_trace(self, name, start, stop, tid):
+        if self.trace:
+            self.trace_events.append({
+                "name": name, "ph": "X", "pid": 0, "tid": tid,
+                "ts": (start - self.start) * 1e6, "dur": (stop - start) * 1e6,
+            })
+
+    def timed(self, name, method, tid):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stop = perf_counter()
+                self.record(name, stop - start)
+                self.record_trace(name, start, stop, tid)
+        return wrapper
+
+    def timed_generator(self, name, method, tid):
+        # handlers suspend while their decisions are made elsewhere, only the time spent inside them counts
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            game = method(*args, **kwargs)
+            decisions = None
+            elapsed = 0.
+            while True:
+                start = perf_counter()
+                try:
+                    requests = game.send(decisions)
+                except StopIteration as result:
+                    stop = perf_counter()
+                    self.record(name, elapsed + stop - start)
+                    self.record_trace(name, start, stop, tid)
+                    return result.value
+                stop = perf_counter()
+                elapsed += stop - start
+                self.record_trace(name, start, stop, tid)
+                decisions = yield requests
+        return wrapper
+
+    def summary(self):
+        result = {}
+        for name, durations in self.durations.items():
+            durations_ms = np.array(durations) * 1e3
+            p50, p90, p99 = np.percentile(durations_ms, (50, 90, 99))
+            result[name] = {
+                "count": len(durations),
+                "total_ms": durations_ms.sum(),
+                "mean_ms": durations_ms.mean(),
+                "p50_ms": p50,
+                "p90_ms": p90,
+                "p99_ms": p99,
+            }
+        return result
+
+    def report(self):
+        lines = ["{:<24}{:>9}{:>12}{:>10}{:>10}{:>10}".format("", "count", "total ms", "p50 ms", "p90 ms", "p99 ms")]
+        stats = sorted(self.summary().items(), key=lambda item: -item[1]["total_ms"])
+        for name, s in stats:
+            lines.append("{:<24}{:>9}{:>12.1f}{:>10.3f}{:>10.3f}{:>10.3f}".format(
+                name, s["count"], s["total_ms"], s["p50_ms"], s["p90_ms"], s["p99_ms"]
+            ))
+        return "\n".join(lines)
+
+    def save_trace(self, path):
+        # open in chrome://tracing or ui.perfetto.dev
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events, "displayTimeUnit": "ms"}, f)
+
+    def clear(self):
+        self.durations.clear()
+        self.trace_events.clear()
+        self.rounds_attached = 0
+        self.start = perf_counter()
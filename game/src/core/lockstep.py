@@ -0,0 +1,118 @@
+import numpy as np
+from time import perf_counter
+import mahjong.constants as mc
+
+from game.src.core.round import Round
+from game.src.core.match import play_match
+from game.src.core.player import Player
+from game.src.core.wall import WallGenerator
+from game.src.core.game_record import GameRecordWriter
+
+
+# Plays many independent rounds side by side in one process: every step gathers the pending decisions of all
+# rounds into one feature matrix per model, runs a single forward pass and scatters the results back
+class LockstepRounds:
+    def __init__(self):
+        self.games = {}  # key -> (round, play() generator)
+        self.pending = {}  # key -> (requests, target_tile)
+        self.finished = {}  # key -> (scores, dealer_won, data)
+
+        self.steps = 0
+        self.decisions = 0
+        self.forward_passes = 0
+        self.rounds_played = 0
+        self.time_spent = 0.  # in add() and step(), the play up to a round's first decisions included
+
+    def add(self, key, rnd: Round):
+        start = perf_counter()
+        self.games[key] = (rnd, rnd.play())
+        self.resume(key, None)
+        self.time_spent += perf_counter() - start
+
+    def resume(self, key, decisions):
+        rnd, game = self.games[key]
+        try:
+            self.pending[key] = game.send(decisions)
+        except StopIteration as stop:
+            del self.games[key]
+            self.pending.pop(key, None)
+            self.finished[key] = stop.value
+            self.rounds_played += 1
+
+    def step(self):
+        start = perf_counter()
+        decisions = {}
+        model_requests = {}  # id(model) -> (model, [(key, request indices)])
+        for key, (requests, target_tile) in self.pending.items():
+            rnd = self.games[key][0]
+            decisions[key], round_model_requests = rnd.decide_unbatched(requests, target_tile)
+            for model_id, (model, indices) in round_model_requests.items():
+                model_requests.setdefault(model_id, (model, []))[1].append((key, indices))
+
+        for model, batches in model_requests.values():
+            requests = [[self.pending[key][0][i] for i in indices] for key, indices in batches]
+            rounds = [self.games[key][0] for key, _ in batches]
+            features = np.concatenate([rnd.load_features(batch) for rnd, batch in zip(rounds, requests)])
+            masks = [np.concatenate(head_masks) for head_masks in
+                     zip(*(rnd.load_masks(batch) for rnd, batch in zip(rounds, requests)))]
+            choices = rounds[0].predict(model, features, masks)  # timed if that round is profiled
+            self.forward_passes += 1
+
+            row = 0
+            for (key, indices), rnd, batch in zip(batches, rounds, requests):
+                batch_choices = [choice[row:row + len(batch)] for choice in choices]
+                for i, decision in zip(indices, rnd.choose_moves(batch, batch_choices)):
+                    decisions[key][i] = decision
+                row += len(batch)
+
+        for key, (requests, _) in list(self.pending.items()):
+            self.games[key][0].curr_player_id = requests[-1][0]
+            self.decisions += len(requests)
+            self.resume(key, decisions[key])
+        self.steps += 1
+        self.time_spent += perf_counter() - start
+
+    def pop_finished(self):
+        finished = list(self.finished.items())
+        self.finished.clear()
+        return finished
+
+    def run(self):
+        while self.pending:
+            self.step()
+        return self.pop_finished()
+
+    def rounds_per_second(self):
+        if not self.time_spent:
+            return 0.
+        return self.rounds_played / self.time_spent
+
+
+# Headless matches played in lockstep, one (scores, collected_data) result per lineup.
+# Every match deals its own walls, so a seeded match plays out the same as run_match with that seed.
+# Records are written as matches finish, each holds its index in lineups and its seed.
+def run_matches(lineups: list[list[Player]], seeds: list[int] = None, match_type=mc.EAST,
+                lockstep: LockstepRounds = None, profiler=None, recorder: GameRecordWriter = None,
+                collect_data=False):
+    if seeds is None:
+        seeds = [0] * len(lineups)
+    if lockstep is None:
+        lockstep = LockstepRounds()
+
+    matches = {}
+    results = [None] * len(lineups)
+    for m, competitors in enumerate(lineups):
+        seed = seeds[m] if seeds[m] else None
+        matches[m] = play_match(competitors, match_type, collect_data=collect_data, profiler=profiler,
+                                walls=WallGenerator(seed), recorder=recorder, match_id=m, seed=seed)
+        lockstep.add(m, next(matches[m]))
+
+    while lockstep.pending or lockstep.finished:
+        if lockstep.pending:
+            lockstep.step()
+        for m, round_result in lockstep.pop_finished():
+            try:
+                lockstep.add(m, matches[m].send(round_result))
+            except StopIteration as stop:
+                results[m] = stop.value
+    return results
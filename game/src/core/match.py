@@ -1,17 +1,36 @@
-import random
 import mahjong.constants as mc
 
 from game.src.core.round import Round
 from game.src.core.replay_round import ReplayRound
+from game.src.core.sim_round import SimRound
+from game.src.core.wall import WallGenerator
+from game.src.core.game_record import GameRecordBuffer, GameRecordWriter, RecordKind
 from ml.src.data_structures import DataPoint
 
 
-# For now, collect_data works only on replay
-def run_match(competitors, seed=0, match_type=mc.EAST, gui=None, match_replay=None, collect_data=False):
+def run_match(competitors, seed=0, match_type=mc.EAST, gui=None, match_replay=None, collect_data=False,
+              profiler=None, walls: WallGenerator = None, recorder: GameRecordWriter = None):
+    seed = seed if seed and walls is None else None  # the seed of walls handed in isn't known
+    if walls is None:
+        walls = WallGenerator(seed)
+    match = play_match(competitors, match_type, gui, match_replay, collect_data, profiler, walls, recorder,
+                       seed=seed)
+    try:
+        rnd = next(match)
+        while True:
+            rnd = match.send(rnd.run())
+    except StopIteration as stop:
+        return stop.value
+
+
+def play_match(competitors, match_type=mc.EAST, gui=None, match_replay=None, collect_data=False, profiler=None,
+               walls: WallGenerator = None, recorder: GameRecordWriter = None, match_id=None, seed=None):
+    # yields every round to be played and expects its (scores, dealer_won, data) sent back.
+    # match_id and the seed walls came from go into the record, if there is one
+    if walls is None:
+        walls = WallGenerator()
     # Initialize
     scores = [250, 250, 250, 250]
-    if seed:
-        random.seed(seed)
     non_repeat_round_no = 0
     round_no = 0
     collected_data: list[DataPoint] = []
@@ -21,8 +40,17 @@ def run_match(competitors, seed=0, match_type=mc.EAST, gui=None, match_replay=No
     wind_offset = mc.EAST  # mahjong.constants WINDS are offset by 27 == mc.EAST
     match_type -= wind_offset  # 0
 
-    if collect_data and match_replay is None:
-        raise NotImplementedError("Collecting data not on replay isn't implemented")
+    if collect_data and match_replay is None and gui is not None:
+        raise ValueError("can't collect data from a match played with a gui, only from replay and headless matches")
+
+    # the match is written out whole once over, a cut-off match never reaches the file
+    record = GameRecordBuffer() if recorder is not None else None
+    if record is not None:
+        record.write(RecordKind.MATCH_START, value=match_type + wind_offset)
+        if match_id is not None:
+            record.write(RecordKind.MATCH_ID, value=match_id)
+        if seed is not None:
+            record.write_seed(seed)
 
     while not (
         min(scores) <= 0 or
@@ -30,12 +58,19 @@ def run_match(competitors, seed=0, match_type=mc.EAST, gui=None, match_replay=No
         round_no >= 12 or
         (match_replay is not None and round_no >= len(match_replay.round_data))
     ):
-        if match_replay is None:
-            rnd = Round(competitors, scores, non_repeat_round_no, match_type, gui)
+        if match_replay is None and gui is None:
+            rnd = SimRound(competitors, scores, non_repeat_round_no, match_type,
+                           walls.next_deck(), walls.round_rng(), collect_data)
+        elif match_replay is None:
+            rnd = Round(competitors, scores, non_repeat_round_no, match_type, gui,
+                        walls.next_deck(), walls.round_rng())
         else:
             rnd = ReplayRound(competitors, scores, non_repeat_round_no, match_type,
                               match_replay.round_data[round_no], collect_data, gui)
-        scores, dealer_won, data = rnd.run()
+        if profiler is not None:
+            profiler.attach(rnd)
+        rnd.recorder = record
+        scores, dealer_won, data = yield rnd
 
         if collect_data:
             collected_data.extend(data)
@@ -50,4 +85,8 @@ def run_match(competitors, seed=0, match_type=mc.EAST, gui=None, match_replay=No
         print("Draw: too many rounds")
     '''
 
+    if record is not None:
+        record.write(RecordKind.MATCH_END)
+        recorder.write_match(record)
+
     return scores, collected_data
\ No newline at end of file
@@ -1,6 +1,10 @@
-
-
 class Player:
     def __init__(self, is_human=False, model=None):
         self.is_human: bool = is_human
         self.model = model
+
+    def decide(self, rnd, requests):
+        # one (discard tile, which chi, action) decision per (seat, possible calls) request of the round rnd,
+        # strategies not backed by a model override this and leave model None
+        choices = rnd.predict(self.model, rnd.load_features(requests), rnd.load_masks(requests))
+        return rnd.choose_moves(requests, choices)
@@ -1,16 +1,26 @@
 from game.src.core.round import Round
 from ml.src.data_structures import DataPoint, RoundData, MoveData
 from game.src.core.player import Player
+from game.src.core.tile import Tile
 from game.src.core.mahjong_enums import EventType, MoveType
+from game.src.core.hand_bits import has_four
 
 
 class ReplayRound(Round):
+    SNAPSHOT_VALUES = Round.SNAPSHOT_VALUES + ("move", "move_id", "deciding_what")
+    SNAPSHOT_SEAT_VALUES = Round.SNAPSHOT_SEAT_VALUES + ("shanten_floor",)
+
     def __init__(self, competitors: list[Player], scores, non_repeat_round_no, match_type,
-                 replay_rounds: RoundData, collect_data=True, gui=None):
+                 replay_rounds: RoundData, collect_data=True, gui=None, fast_forward=True):
         self.replay_rounds = replay_rounds
         self.collect_data = collect_data
         self.collected_data: list[DataPoint] = []
 
+        # fast_forward: skip the legality probes whose outcome the log or an earlier shanten already tells,
+        # the possible calls and so the data stay the same
+        self.fast_forward = fast_forward
+        self.shanten_floor = [-1] * 4  # no lower than this, for closed hands without melds
+
         self.move = MoveData()
         self.move_id = -1  # incremented before decision
         self.deciding_what: EventType = EventType.DRAW_TILE
@@ -38,15 +48,51 @@ class ReplayRound(Round):
         self.turn_no = 0
 
     def track_draw_tile(self, tile=None):
-        if tile is None and self.turn_no < 70:
+        if tile is None and (self.turn_no < 70 or self.after_a_kan):
             self.increment_move()
             assert self.move.move_type == MoveType.DRAW
             tile = self.move.tile
+        # a draw lowers shanten by one at most, unless the hand holds a quad; a discard never lowers it
+        quad = has_four(self.closed_hand_bits[self.curr_player_id])
         super().track_draw_tile(tile)
+        self.shanten_floor[self.curr_player_id] = -1 if quad else self.shanten_floor[self.curr_player_id] - 1
+
+    def get_shanten(self, p):
+        self.shanten_floor[p] = super().get_shanten(p)
+        return self.shanten_floor[p]
+
+    def surely_not_ready(self, p):
+        return self.fast_forward and not self.melds[p] and self.shanten_floor[p] >= 1
+
+    def next_move_is(self, move_type: MoveType):
+        # the log says the seat deciding now makes this move next
+        next_move = self.replay_rounds.moves[self.move_id + 1]
+        return self.fast_forward and next_move.move_type == move_type and next_move.player_id == self.curr_player_id
+
+    def is_riichi_possible(self):
+        if self.next_move_is(MoveType.RIICHI):
+            return True
+        if self.surely_not_ready(self.curr_player_id):
+            return False
+        return super().is_riichi_possible()
+
+    def is_win_possible(self, tsumo=True, fake_tile: Tile = None):
+        if self.next_move_is(MoveType.TSUMO if tsumo else MoveType.RON):
+            return True
+        return super().is_win_possible(tsumo, fake_tile)
+
+    def update_waits(self, p):
+        if self.surely_not_ready(p):
+            self.tenpai[p] = False
+            self.waits[p] = ()
+            self.wait_bits[p] = 0
+            self.waits_outdated[p] = False
+            return
+        super().update_waits(p)
 
     def handle_draw_tile(self):
         self.deciding_what = EventType.DRAW_TILE
-        super().handle_draw_tile()
+        yield from super().handle_draw_tile()
 
     def after_riichi_discard(self):
         self.increment_move()
@@ -59,20 +105,27 @@ class ReplayRound(Round):
 
     def handle_discard_tile(self):
         self.deciding_what = EventType.DISCARD_TILE
-        super().handle_discard_tile()
+        yield from super().handle_discard_tile()
 
     def handle_tile_discarded(self):
         self.deciding_what = EventType.TILE_DISCARDED
-        super().handle_tile_discarded()
+        yield from super().handle_tile_discarded()
 
     def handle_after_kan(self):
         self.deciding_what = EventType.AFTER_KAN
-        super().handle_after_kan()
+        yield from super().handle_after_kan()
 
     def increment_move(self):
         self.move_id += 1
         self.move = self.replay_rounds.moves[self.move_id]
 
+    def moved_by_deciding_seat(self, move: MoveData):
+        # several seats may be able to make the same call, logs without seats trust the first one asking
+        return move.player_id is None or move.player_id == self.curr_player_id
+
+    def decision_model(self, p):
+        return None  # every decision comes from the log, in seat order
+
     def decide(self, possible_calls: list[MoveType], target_tile=None):
         discard_tile, which_chi, take_action = None, None, None
         next_move = self.replay_rounds.moves[self.move_id + 1]
@@ -104,7 +157,7 @@ class ReplayRound(Round):
                 # possible calls: PASS CHI PON KAN RON
                 # output: call_tile, take_action
                 if next_move.move_type in (MoveType.CHI, MoveType.PON, MoveType.KAN, MoveType.RON) and \
-                        next_move.move_type in possible_calls:
+                        next_move.move_type in possible_calls and self.moved_by_deciding_seat(next_move):
                     self.increment_move()
                     if self.move.move_type == MoveType.CHI:
                         chi_delta = [t.id34() - self.move.tile.id34() for t in self.move.base]
@@ -121,7 +174,7 @@ class ReplayRound(Round):
             case EventType.AFTER_KAN:
                 # possible calls: PASS RON(steal kan)
                 # output: take_action
-                if next_move.move_type == MoveType.RON:
+                if next_move.move_type == MoveType.RON and self.moved_by_deciding_seat(next_move):
                     self.increment_move()
                     take_action = self.move.move_type
                 else:
@@ -134,6 +187,6 @@ class ReplayRound(Round):
             self.collected_data.append(datapoint)
         return discard_tile, which_chi, take_action
 
-    def run(self):
-        super().run()
+    def play(self):
+        yield from super().play()
         return self.scores, self.dealer_won, self.collected_data
@@ -1,31 +1,30 @@
-import random
+import copy
 import numpy as np
+import torch
+from typing import NamedTuple
 from time import sleep
 from sys import exit
-from mahjong import agari
 from mahjong.meld import Meld
-from mahjong.hand_calculating.hand import HandCalculator
-from mahjong.hand_calculating.hand_config import HandConfig, OptionalRules
 import mahjong.constants as mc
 
-from ml.src.data_structures import DataPoint
 from game.src.core.player import Player
 from game.src.core.mahjong_enums import EventType, RiichiStatus, FuritenStatus, MoveType
 from game.src.core.tile import Tile
-from game.src.core.shanten import correct_shanten
+from game.src.core.round_state import RoundState
+from game.src.core.round_features import gather_features, fill_round_features
+from game.src.core.shanten import correct_shanten, correct_shanten_many
+from game.src.core.waits import wait_tiles
+from game.src.core.agari_table import is_agari, ORPHAN_INDICES
+from game.src.core.scoring import scoring_service
+from game.src.core.game_record import GameRecordBuffer, RecordKind, pack_tiles
+from game.src.core.efficiency import efficiency_service, DiscardEfficiency, HandEfficiency
+from game.src.core.hand_bits import CHI_SHAPES, tile_bit, count_of, from_counts, has_four, chi_bits
 
 
-def wind_from_int(wind_id):
-    match wind_id:
-        case 0:
-            return mc.EAST
-        case 1:
-            return mc.SOUTH
-        case 2:
-            return mc.WEST
-        case 3:
-            return mc.NORTH
-    raise ValueError("invalid wind id")
+def predict(model, features: np.ndarray, masks: list[np.ndarray]):
+    # (discard tile id34, which chi, action) choices among legal options, one row per feature row
+    choices = model.get_choices(torch.from_numpy(features), [torch.from_numpy(mask) for mask in masks])
+    return [choice.numpy(force=True) for choice in choices]
 
 
 def count_tiles(tiles: list[Tile]):
@@ -48,14 +47,42 @@ class Event:
         return f"{self.what} {self.who} {self.from_who}"
 
 
+# Immutable copy of everything game-relevant in a Round (no GUI, models or hand calculator)
+class RoundSnapshot(NamedTuple):
+    state: RoundState  # read-only, restore copies it into the round's own buffers
+    values: tuple  # Round.SNAPSHOT_VALUES, in order
+    seat_values: tuple[tuple, ...]  # Round.SNAPSHOT_SEAT_VALUES, in order
+    tile_lists: tuple[tuple[Tile, ...], ...]  # Round.SNAPSHOT_TILE_LISTS, in order
+    seat_tile_lists: tuple[tuple[tuple[Tile, ...], ...], ...]  # Round.SNAPSHOT_SEAT_TILE_LISTS, in order
+    melds: tuple[tuple[tuple, ...], ...]
+    event: tuple | None
+    rng_state: dict
+
+
 # Main game logic
 class Round:
-    def __init__(self, competitors: list[Player], scores, non_repeat_round_no, match_type, gui=None):
-        self.hand_calculator = HandCalculator()
+    SNAPSHOT_VALUES = (
+        "dealer_id", "prevalent_wind", "turn_no", "round_no", "curr_player_id", "dora_revealed_no",
+        "four_quads_draw_flag", "after_a_kan", "stolen_kan", "dealer_won", "finished", "tile", "open_kan",
+        "kan_tile", "discard_after_kan",
+    )
+    SNAPSHOT_SEAT_VALUES = (
+        "seat_wind", "scores", "first_move", "riichi_status", "furiten_status", "double_riichi", "ippatsu",
+        "nagashi_mangan", "shanten", "shanten_outdated", "tenpai", "waits", "wait_bits", "waits_outdated",
+        "closed_hand_bits", "pon_bits",
+    )
+    SNAPSHOT_TILE_LISTS = ("wall", "dora_indicators", "uradora_indicators", "dead_wall")
+    SNAPSHOT_SEAT_TILE_LISTS = ("closed_hands", "open_hands", "discard_piles")
+
+    def __init__(self, competitors: list[Player], scores, non_repeat_round_no, match_type, gui=None,
+                 deck: np.ndarray = None, rng: np.random.Generator = None):
         self.competitors = competitors
+        self.deck = deck if deck is not None else np.random.default_rng().permutation(34 * 4)
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.scores = scores
         self.gui = gui
         self.board = None
+        self.recorder: GameRecordBuffer | None = None  # set by the match to keep a game record
 
         # INIT
         self.dealer_id = non_repeat_round_no % 4
@@ -65,20 +92,11 @@ class Round:
         self.round_no = non_repeat_round_no
         self.curr_player_id = self.dealer_id
         self.closed_hands: list[list[Tile]] = [[] for _ in range(4)]
-        self.closed_hand_counts = [[0] * 34 for _ in range(4)]
         self.open_hands: list[list[Tile]] = [[] for _ in range(4)]
-        self.open_hand_counts = [[0] * 34 for _ in range(4)]
         self.melds: list[list[Meld]] = [[] for _ in range(4)]
         self.discard_piles: list[list[Tile]] = [[] for _ in range(4)]
-        self.discard_orders = [[0] * 34 for _ in range(4)]
-        self.hidden_tile_counts = [[4] * 34 for _ in range(4)]
-        self.hand_in_riichi = [0] * 4
-        self.hand_is_closed = [1] * 4
-        self.visible_dora = [0] * 34
-        self.red5_closed_hand = [[0] * 3 for _ in range(4)]
-        self.red5_open_hand = [[0] * 3 for _ in range(4)]
-        self.red5_discarded = [0] * 3
-        self.red5_hidden = [[1] * 3 for _ in range(4)]
+
+        self.bind_state(RoundState())
 
         # extra tracking
         self.first_move = [True] * 4
@@ -89,9 +107,15 @@ class Round:
         self.ippatsu = [False] * 4
         self.after_a_kan = False
         self.stolen_kan = False
-        self.waiting_tiles = [[False] * 34 for _ in range(4)]
-        self.can_riichi_discard = [[False] * 34 for _ in range(4)]
         self.nagashi_mangan = [False] * 4
+        self.shanten = [8] * 4
+        self.shanten_outdated = [True] * 4
+        self.tenpai = [False] * 4  # ready with a 13 tile hand, as of the last update_waits
+        self.waits: list[tuple[int, ...]] = [() for _ in range(4)]
+        self.wait_bits = [0] * 4  # bit i set if tile id34 i completes the hand shape
+        self.waits_outdated = [True] * 4
+        self.closed_hand_bits = [0] * 4  # closed_hand_counts packed by hand_bits, kept in step with it
+        self.pon_bits = [0] * 4  # bit i set if the seat has an open pon of tile id34 i
 
         self.wall: list[Tile] = []
         self.dora_indicators: list[Tile] = []
@@ -110,14 +134,133 @@ class Round:
         self.kan_tile = Tile(-1)
         self.discard_after_kan = False
 
+    def bind_state(self, state: RoundState):
+        # tile tracking, views into self.state
+        self.state = state
+        self.closed_hand_counts = self.state.closed_hand_counts
+        self.open_hand_counts = self.state.open_hand_counts
+        self.discard_orders = self.state.discard_orders
+        self.hidden_tile_counts = self.state.hidden_tile_counts
+        self.hand_in_riichi = self.state.hand_in_riichi
+        self.closed_hand_tiles = self.state.closed_hand_tiles
+        self.hand_is_closed = self.state.hand_is_closed
+        self.visible_dora = self.state.visible_dora
+        self.red5_closed_hand = self.state.red5_closed_hand
+        self.red5_open_hand = self.state.red5_open_hand
+        self.red5_discarded = self.state.red5_discarded
+        self.red5_hidden = self.state.red5_hidden
+        self.waiting_tiles = self.state.waiting_tiles
+        self.can_riichi_discard = self.state.can_riichi_discard
+
+    def snapshot(self) -> RoundSnapshot:
+        return RoundSnapshot(
+            self.state.copy(writeable=False),
+            tuple(getattr(self, name) for name in self.SNAPSHOT_VALUES),
+            tuple(tuple(getattr(self, name)) for name in self.SNAPSHOT_SEAT_VALUES),
+            tuple(tuple(getattr(self, name)) for name in self.SNAPSHOT_TILE_LISTS),
+            tuple(tuple(tuple(tiles) for tiles in getattr(self, name)) for name in self.SNAPSHOT_SEAT_TILE_LISTS),
+            tuple(
+                tuple((m.type, tuple(m.tiles), m.opened, m.called_tile, m.who, m.from_who) for m in melds)
+                for melds in self.melds
+            ),
+            None if self.event is None else (
+                self.event.what,
+                tuple(self.event.who) if isinstance(self.event.who, list) else self.event.who,
+                self.event.from_who,
+            ),
+            self.rng.bit_generator.state,
+        )
+
+    def restore(self, snapshot: RoundSnapshot):
+        self.state.copy_from(snapshot.state)
+        for name, value in zip(self.SNAPSHOT_VALUES, snapshot.values):
+            setattr(self, name, value)
+        for name, values in zip(self.SNAPSHOT_SEAT_VALUES, snapshot.seat_values):
+            setattr(self, name, list(values))
+        for name, tiles in zip(self.SNAPSHOT_TILE_LISTS, snapshot.tile_lists):
+            setattr(self, name, list(tiles))
+        for name, seat_tiles in zip(self.SNAPSHOT_SEAT_TILE_LISTS, snapshot.seat_tile_lists):
+            setattr(self, name, [list(tiles) for tiles in seat_tiles])
+        self.melds = [
+            [Meld(meld_type=t, tiles=list(tiles), opened=o, called_tile=c, who=w, from_who=f)
+             for t, tiles, o, c, w, f in melds]
+            for melds in snapshot.melds
+        ]
+        if snapshot.event is None:
+            self.event = None
+        else:
+            what, who, from_who = snapshot.event
+            self.event = Event(what, list(who) if isinstance(who, tuple) else who, from_who)
+        self.rng.bit_generator.state = snapshot.rng_state
+
+    def clone(self):
+        # shares competitors, drops the GUI, has its own copy of the rng
+        clone = copy.copy(self)
+        for name, value in vars(self).items():
+            if callable(value) and hasattr(value, "__wrapped__"):
+                delattr(clone, name)  # profiler wrappers stay bound to the original round
+        clone.gui = None
+        clone.board = None
+        clone.recorder = None
+        clone.rng = copy.deepcopy(self.rng)
+        clone.bind_state(RoundState())
+        clone.restore(self.snapshot())
+        return clone
+
+    def determinize(self, p, rng: np.random.Generator):
+        # deals everything p can't see anew: other closed hands, the wall and the unrevealed dead wall.
+        # Hands are drawn uniformly from the unseen tiles, regardless of what their owners have done so far
+        seen = np.zeros(136, dtype=np.bool_)
+        for tiles in [self.closed_hands[p], *self.discard_piles, *self.open_hands,
+                      self.dora_indicators[:self.dora_revealed_no]]:
+            seen[[tile.id136() for tile in tiles]] = True
+        unseen = [Tile.of(t) for t in rng.permutation(np.flatnonzero(~seen)).tolist()]
+
+        others = [q for q in range(4) if q != p]
+        for q in others:
+            hand, unseen = unseen[:len(self.closed_hands[q])], unseen[len(self.closed_hands[q]):]
+            red5_held = self.red5_closed_hand[q].copy()
+            self.hidden_tile_counts[q] += self.closed_hand_counts[q]
+            self.closed_hands[q] = hand
+            self.closed_hand_counts[q] = count_tiles(hand)
+            self.hidden_tile_counts[q] -= self.closed_hand_counts[q]
+            self.closed_hand_bits[q] = from_counts(self.closed_hand_counts[q])
+            self.closed_hand_tiles[q] = False
+            self.closed_hand_tiles[q][[tile.id136() for tile in hand]] = True
+            self.red5_closed_hand[q] = 0
+            for tile in hand:
+                if tile.is_red5():
+                    self.red5_closed_hand[q][tile.id34() // 9] = 1
+            self.red5_hidden[q] = (self.red5_hidden[q] | red5_held) & (1 - self.red5_closed_hand[q])
+            self.hand_changed(q)
+
+        # tiles still to come, never the ones already drawn
+        n_wall = max(len(self.wall) - self.turn_no, 0)
+        self.wall[len(self.wall) - n_wall:], unseen = unseen[:n_wall], unseen[n_wall:]
+        n_dora = len(self.dora_indicators) - self.dora_revealed_no
+        self.dora_indicators[self.dora_revealed_no:], unseen = unseen[:n_dora], unseen[n_dora:]
+        n_dead = len(self.dead_wall) - self.kans_made()
+        self.dead_wall[len(self.dead_wall) - n_dead:], unseen = unseen[:n_dead], unseen[n_dead:]
+        n_ura = len(self.uradora_indicators)
+        self.uradora_indicators = unseen[:n_ura]
+
+        for q in others:
+            # none of them holds a drawn tile while p decides
+            self.update_waits(q)
+            if self.furiten_status[q] != FuritenStatus.PERM_FURITEN:
+                self.furiten_status[q] = FuritenStatus.DEFAULT
+            self.track_waiting_tiles(q)
+            if self.furiten_status[q] != FuritenStatus.PERM_FURITEN and \
+                    (self.waiting_tiles[q] & (self.discard_orders[q] > 0)).any():
+                self.furiten_status[q] = FuritenStatus.TEMP_FURITEN
+
     def check_input(self):
         if any(c.is_human for c in self.competitors) and self.gui is None:
             raise ValueError("need gui with human competitors")
 
     def prep_round(self):
         # PREP ROUND
-        game_tiles = [Tile(t) for t in range(34 * 4)]
-        random.shuffle(game_tiles)
+        game_tiles = [Tile.of(t) for t in self.deck.tolist()]
 
         # give out tiles to players
         for p in range(4):
@@ -168,23 +311,42 @@ class Round:
         if self.board and (not self.competitors[self.curr_player_id].is_human or delay_human):
             sleep(t)
 
+    def restrict_tiles(self, can_select_tiles):
+        if self.board:
+            self.board.restrict_tiles(can_select_tiles)
+
+    def lift_restriction_tiles(self):
+        if self.board:
+            self.board.lift_restriction_tiles()
+
+    def show_scores(self, score_change, text):
+        if not self.board:
+            return
+        self.board.show_scores(self.scores, score_change, text)
+        while not self.board.score_display.ready_to_continue:
+            if not self.gui.playing:
+                exit()
+
     def track_draw_tile(self, tile=None):
-        if self.turn_no == 70 and not self.after_a_kan:
+        if self.turn_no >= 70 and not self.after_a_kan:  # every kan replacement draw shortens the wall
             self.event = Event(EventType.WALL_EXHAUSTED)
             return
         elif tile is None and not self.after_a_kan:
             self.tile = self.wall[self.turn_no]
         elif tile is None:
-            self.tile = self.dead_wall[self.dora_revealed_no - 1]
-            if self.dora_revealed_no == 5 and sum(
-                    self.open_hand_counts[self.curr_player_id]) != 16:  # 4 kans by >1 player
+            self.tile = self.dead_wall[self.kans_made() - 1]  # the n-th kan takes the n-th replacement tile
+            if self.kans_made() == 4 and \
+                    self.open_hand_counts[self.curr_player_id].sum() != 16:  # 4 kans by >1 player
                 self.four_quads_draw_flag = True
         else:
             self.tile = tile
         self.turn_no += 1
 
         self.closed_hand_counts[self.curr_player_id][self.tile.id34()] += 1
+        self.closed_hand_bits[self.curr_player_id] += tile_bit(self.tile.id34())
         self.closed_hands[self.curr_player_id].append(self.tile)
+        self.closed_hand_tiles[self.curr_player_id][self.tile.id136()] = True
+        self.hand_changed(self.curr_player_id)
         self.hidden_tile_counts[self.curr_player_id][self.tile.id34()] -= 1
         if self.tile.is_red5():
             self.red5_closed_hand[self.curr_player_id][self.tile.id34() // 9] = 1
@@ -195,6 +357,7 @@ class Round:
     def track_steal_tile(self, tile, from_who):
         self.open_hands[self.curr_player_id].append(self.discard_piles[from_who].pop())
         self.open_hand_counts[self.curr_player_id][tile.id34()] += 1
+        self.hand_changed(self.curr_player_id)
         if tile.is_red5():
             self.red5_discarded[tile.id34() // 9] = 0
             self.red5_open_hand[self.curr_player_id][tile.id34() // 9] = 1
@@ -203,71 +366,112 @@ class Round:
         self.open_hands[self.curr_player_id].append(tile)
         self.open_hand_counts[self.curr_player_id][tile.id34()] += 1
         self.closed_hands[self.curr_player_id].remove(tile)
+        self.closed_hand_tiles[self.curr_player_id][tile.id136()] = False
         self.closed_hand_counts[self.curr_player_id][tile.id34()] -= 1
+        self.closed_hand_bits[self.curr_player_id] -= tile_bit(tile.id34())
+        self.hand_changed(self.curr_player_id)
         if tile.is_red5():
             self.red5_closed_hand[self.curr_player_id][tile.id34() // 9] = 0
             self.red5_open_hand[self.curr_player_id][tile.id34() // 9] = 1
-        for p in range(4):
-            if self.curr_player_id == p:
-                continue
-            self.hidden_tile_counts[p][tile.id34()] -= 1
+        # reveal to everyone but the owner
+        self.hidden_tile_counts[:, tile.id34()] -= 1
+        self.hidden_tile_counts[self.curr_player_id][tile.id34()] += 1
+
+    def hand_changed(self, p):
+        # shanten is recalculated lazily, at most once per hand change
+        self.shanten_outdated[p] = True
+        self.waits_outdated[p] = True
+
+    def get_shanten(self, p):
+        if self.shanten_outdated[p]:
+            self.shanten[p] = correct_shanten(self.closed_hand_counts[p] + self.open_hand_counts[p], self.melds[p])
+            self.shanten_outdated[p] = False
+        return self.shanten[p]
+
+    def is_tenpai(self, p):
+        return self.get_shanten(p) <= 0
+
+    def update_waits(self, p):
+        # tiles completing the hand shape of a seat that isn't holding a drawn tile
+        self.tenpai[p] = self.get_shanten(p) == 0
+        self.waits[p] = wait_tiles(self.closed_hand_counts[p], bool(self.melds[p])) if self.tenpai[p] else ()
+        self.wait_bits[p] = sum(1 << i for i in self.waits[p])
+        self.waits_outdated[p] = False
+
+    def get_waits(self, p):
+        if self.waits_outdated[p]:
+            self.update_waits(p)
+        return self.waits[p]
+
+    def waits_on(self, p, tile_id34):
+        if self.waits_outdated[p]:
+            self.update_waits(p)
+        return self.wait_bits[p] >> tile_id34 & 1
+
+    def discard_efficiency(self, p) -> DiscardEfficiency:
+        # for a seat holding a drawn tile: every discard's shanten, improving tiles and their copies p hasn't seen
+        return efficiency_service.discard_efficiency(
+            self.closed_hand_counts[p], len(self.melds[p]), self.hidden_tile_counts[p]
+        )
 
-    def open_melds_tile_id34s(self):
-        return [[t // 4 for t in m.tiles] for m in self.melds[self.curr_player_id]]
+    def hand_efficiency(self, p) -> HandEfficiency:
+        return efficiency_service.hand_efficiency(
+            self.closed_hand_counts[p], len(self.melds[p]), self.hidden_tile_counts[p]
+        )
 
     def is_closed_kan_possible(self):
-        return any(self.closed_hand_counts[self.curr_player_id][i] == 4 for i in range(34))
+        return has_four(self.closed_hand_bits[self.curr_player_id]) and self.is_kan_left()
 
     def is_added_kan_possible(self):
-        return any(meld.type == Meld.PON and meld.tiles[0] // 4 == self.tile.id34()
-                   for meld in self.melds[self.curr_player_id])
+        return bool(self.pon_bits[self.curr_player_id] >> self.tile.id34() & 1) and self.is_kan_left()
 
-    def is_riichi_possible(self):
-        tiles_to_ready_hand = correct_shanten(
-            [self.closed_hand_counts[self.curr_player_id][i] +
-             self.open_hand_counts[self.curr_player_id][i]
-             for i in range(34)],
-            self.melds[self.curr_player_id]
-        )
-        return tiles_to_ready_hand == 0 and \
-               self.hand_is_closed[self.curr_player_id] and \
-               not self.hand_in_riichi[self.curr_player_id] and \
-               self.scores[self.curr_player_id] > 10
+    def is_kan_left(self):
+        # the dead wall only holds four replacement tiles, there is no fifth kan
+        return self.kans_made() < 4
 
-    def get_hand_result(self, config=None, tsumo=True, fake_tile: Tile = None):
-        if fake_tile is not None:
-            self.closed_hands[self.curr_player_id].append(fake_tile)
+    def kans_made(self):
+        return sum(meld.type in (Meld.KAN, Meld.SHOUMINKAN) for melds in self.melds for meld in melds)
 
+    def is_riichi_possible(self):
+        return self.hand_is_closed[self.curr_player_id] and \
+               not self.hand_in_riichi[self.curr_player_id] and \
+               self.scores[self.curr_player_id] > 10 and \
+               self.get_shanten(self.curr_player_id) == 0 and \
+               self.has_riichi_discard()
+
+    def has_riichi_discard(self):
+        # shanten counts a closed kan's tiles as free ones, so it can be 0 with only a kan tile to let go of
+        self.set_riichi_discards()
+        p = self.curr_player_id
+        return bool((self.can_riichi_discard[p] & (self.closed_hand_counts[p] > 0)).any())
+
+    def hand_query(self, p, config=None, tsumo=True, fake_tile: Tile = None):
+        # (tiles136, win_tile136, melds, config, config key) as the scoring service takes it
         if config is None:
-            config = HandConfig(
-                is_tsumo=tsumo,
-                is_riichi=self.hand_in_riichi[self.curr_player_id],
-                player_wind=wind_from_int(self.seat_wind[self.curr_player_id]),
-                round_wind=wind_from_int(self.prevalent_wind),
-                options=OptionalRules(has_open_tanyao=True)
+            config = scoring_service.probe_config(
+                self.seat_wind[p], self.prevalent_wind, tsumo, bool(self.hand_in_riichi[p])
             )
-        tiles136 = [
-            t.id136()
-            for t in self.closed_hands[self.curr_player_id] + self.open_hands[self.curr_player_id]
-        ]
-        win_tile136 = self.closed_hands[self.curr_player_id][-1].id136()
-        hand_result = self.hand_calculator.estimate_hand_value(
-            tiles=tiles136, win_tile=win_tile136, melds=self.melds[self.curr_player_id], config=config
-        )
+        tiles136 = [t.id136() for t in self.closed_hands[p] + self.open_hands[p]]
         if fake_tile is not None:
-            self.closed_hands[self.curr_player_id].pop()
-        return hand_result
+            tiles136.append(fake_tile.id136())
+            win_tile136 = fake_tile.id136()
+        else:
+            win_tile136 = self.closed_hands[p][-1].id136()
+        return (tiles136, win_tile136, self.melds[p]) + config
+
+    def get_hand_result(self, config=None, tsumo=True, fake_tile: Tile = None):
+        return scoring_service.estimate_hand_value(*self.hand_query(self.curr_player_id, config, tsumo, fake_tile))
+
+    def get_wait_results(self, p, waits):
+        # hand results of p winning on each wait tile, in one scoring call
+        return scoring_service.estimate_hand_values([self.hand_query(p, fake_tile=Tile.of(i * 4)) for i in waits])
 
     def is_win_possible(self, tsumo=True, fake_tile: Tile = None):
         if fake_tile is not None:
             self.closed_hand_counts[self.curr_player_id][fake_tile.id34()] += 1
 
-        if agari.Agari().is_agari(
-            [self.closed_hand_counts[self.curr_player_id][i] +
-             self.open_hand_counts[self.curr_player_id][i]
-             for i in range(34)],
-            self.open_melds_tile_id34s()
-        ):
+        # cheap table lookup first, yaku only for complete hands
+        if is_agari(self.closed_hand_counts[self.curr_player_id], bool(self.melds[self.curr_player_id])):
             if fake_tile is not None:
                 self.closed_hand_counts[self.curr_player_id][fake_tile.id34()] -= 1
             return self.get_hand_result(tsumo=tsumo, fake_tile=fake_tile).error is None
@@ -277,7 +481,8 @@ class Round:
         return False
 
     def is_ron_possible(self):
-        return self.furiten_status[self.curr_player_id] == FuritenStatus.DEFAULT and \
+        return self.waits_on(self.curr_player_id, self.tile.id34()) and \
+            self.furiten_status[self.curr_player_id] == FuritenStatus.DEFAULT and \
             self.is_win_possible(tsumo=False, fake_tile=self.tile)
 
     def reveal_dora(self):
@@ -289,26 +494,28 @@ class Round:
         dora_indicator = self.dora_indicators[self.dora_revealed_no]
         self.visible_dora[dora_indicator.id34()] += 1
         self.dora_revealed_no += 1
-        for p in range(4):
-            self.hidden_tile_counts[p][dora_indicator.id34()] -= 1
-            if dora_indicator.is_red5():
-                self.red5_hidden[p][dora_indicator.id34() // 9] = 0
+        self.hidden_tile_counts[:, dora_indicator.id34()] -= 1
+        self.record(RecordKind.DORA, tile=dora_indicator.id136())
+        if dora_indicator.is_red5():
+            self.red5_hidden[:, dora_indicator.id34() // 9] = 0
 
     def play_kan(self, is_closed_kan, is_added_kan, from_who):
         # Closed kan can be played with tile not drawn this turn
-        if is_closed_kan and self.closed_hand_counts[self.curr_player_id][self.kan_tile.id34()] != 4:
+        if is_closed_kan and self.closed_hand_counts[self.curr_player_id][self.tile.id34()] != 4:
             for t in self.closed_hands[self.curr_player_id]:
                 if self.closed_hand_counts[self.curr_player_id][t.id34()] == 4:
                     self.tile = t
                     break
 
-        meld_tiles = [Tile(t) for t in range(self.tile.id34() * 4, (self.tile.id34() + 1) * 4)]
+        meld_tiles = [Tile.of(t) for t in range(self.tile.id34() * 4, (self.tile.id34() + 1) * 4)]
+        self.record(MoveType.KAN.value, self.curr_player_id, self.tile.id136())
         self.open_kan = not is_closed_kan
         self.kan_tile = self.tile
         self.after_a_kan = True
         self.discard_after_kan = True
 
         if is_added_kan:
+            self.pon_bits[self.curr_player_id] &= ~(1 << self.tile.id34())
             for i, meld in enumerate(self.melds[self.curr_player_id]):
                 if meld.type == Meld.PON and meld.tiles[0] // 4 == self.tile.id34():
                     self.melds[self.curr_player_id][i] = Meld(
@@ -360,7 +567,9 @@ class Round:
                 meld_tiles.append(self.closed_hands[self.curr_player_id][i])
                 ctr += 1
         meld_tiles.append(self.tile)
+        self.record(MoveType.PON.value, self.curr_player_id, self.tile.id136(), pack_tiles(meld_tiles))
 
+        self.pon_bits[self.curr_player_id] |= 1 << self.tile.id34()
         self.melds[self.curr_player_id].append(
             Meld(
                 meld_type=Meld.PON,
@@ -395,7 +604,7 @@ class Round:
                 self.board.switch_game_state("WAITING")
         elif not self.competitors[self.curr_player_id].is_human and len(possible_chi) > 1:
             best_chi_value = 0.
-            for i, chi in enumerate(((-2, -1), (-1, 1), (1, 2))):
+            for i, chi in enumerate(CHI_SHAPES):
                 if chi in possible_chi:
                     chi_value = chi_prob[self.curr_player_id][i]
                     if chi_value > best_chi_value:
@@ -403,25 +612,17 @@ class Round:
                         best_chi_value = chi_value
 
             if not best_chi_value:
-                best_chi = random.choice(possible_chi)
+                best_chi = possible_chi[self.rng.integers(len(possible_chi))]
 
         # move tiles to open hand
         meld_tiles = []
         for tile_id_mod in best_chi:
-            found = False
-            for tile_id in range((self.tile.id34() + tile_id_mod) * 4 + 3,
-                                 (self.tile.id34() + tile_id_mod) * 4 - 1, -1):
-                for i in range(len(self.closed_hands[self.curr_player_id])):
-                    if self.closed_hands[self.curr_player_id][i].id136() == tile_id:
-                        meld_tiles.append(self.closed_hands[self.curr_player_id][i])
-                        found = True
-                        break
-                if found:
-                    break
+            meld_tiles.append(self.closed_tile(self.curr_player_id, self.tile.id34() + tile_id_mod))
         meld_tiles.append(self.tile)
 
         if exact_tiles is not None:
             meld_tiles = exact_tiles
+        self.record(MoveType.CHI.value, self.curr_player_id, self.tile.id136(), pack_tiles(meld_tiles))
 
         self.melds[self.curr_player_id].append(
             Meld(
@@ -444,6 +645,7 @@ class Round:
         self.update_board(play_sound_name="tile_meld")
 
     def play_riichi(self):
+        self.record(MoveType.RIICHI.value, self.curr_player_id)
         self.hand_in_riichi[self.curr_player_id] = self.turn_no
         self.riichi_status[self.curr_player_id] = RiichiStatus.RIICHI_DISCARD
         self.double_riichi[self.curr_player_id] = self.first_move[self.curr_player_id]
@@ -451,15 +653,15 @@ class Round:
         self.event = Event(EventType.DISCARD_TILE, self.curr_player_id)
 
     def set_riichi_discards(self):
-        for tile in self.closed_hands[self.curr_player_id]:
-            # is shanten still 0 if you discard the tile
-            self.can_riichi_discard[self.curr_player_id][tile.id34()] = 0 == correct_shanten(
-                [self.closed_hand_counts[self.curr_player_id][i] +
-                 self.open_hand_counts[self.curr_player_id][i] -
-                 int(i == tile.id34())
-                 for i in range(34)],
-                self.melds[self.curr_player_id]
-            )
+        # is shanten still 0 if you discard the tile
+        discard_ids = np.flatnonzero(self.closed_hand_counts[self.curr_player_id])
+        hands = np.repeat(
+            (self.closed_hand_counts[self.curr_player_id] + self.open_hand_counts[self.curr_player_id])[np.newaxis],
+            len(discard_ids), axis=0
+        )
+        hands[np.arange(len(discard_ids)), discard_ids] -= 1
+        shantens = correct_shanten_many(list(hands), self.melds[self.curr_player_id])
+        self.can_riichi_discard[self.curr_player_id][discard_ids] = np.equal(shantens, 0)
 
     def play_tsumo(self):
         self.event = Event(EventType.WINNER, [self.curr_player_id], self.curr_player_id)
@@ -482,83 +684,156 @@ class Round:
         return output
 
     def load_input(self, datapoint, possible_calls):
-        tile_to_call = None
-        tile_origin = None
-        if any(2 <= pc.value <= 7 for pc in possible_calls):
-            tile_to_call = self.tile.id34()
-            tile_origin = self.event.from_who if self.event.from_who is not None else self.event.who
-
-        datapoint.load_features(
-            self.curr_player_id, self.round_no, self.turn_no, self.dealer_id, self.prevalent_wind,
-            self.seat_wind[self.curr_player_id], self.closed_hand_counts[self.curr_player_id],
-            self.open_hand_counts, self.discard_orders, self.hidden_tile_counts[self.curr_player_id],
-            self.visible_dora, self.hand_is_closed, self.hand_in_riichi, self.scores,
-            self.red5_closed_hand[self.curr_player_id], self.red5_open_hand, self.red5_discarded,
-            self.red5_hidden[self.curr_player_id], tile_to_call, tile_origin
-        )
+        datapoint.features = self.load_features([(self.curr_player_id, possible_calls)])[0]
+
+    def decision_model(self, p):
+        # model this seat's decisions can be batched on, None if it has to decide on its own
+        competitor = self.competitors[p]
+        return None if competitor.is_human else competitor.model
+
+    def decide_unbatched(self, requests: list[tuple[int, list[MoveType]]], target_tile=None):
+        # decides seats without a model right away, returns the rest grouped per model instance
+        decisions = [None] * len(requests)
+        model_requests = {}
+        for i, (p, possible_calls) in enumerate(requests):
+            model = self.decision_model(p)
+            if model is None:
+                self.curr_player_id = p
+                decisions[i] = self.decide(possible_calls, target_tile)
+            else:
+                model_requests.setdefault(id(model), (model, []))[1].append(i)
+        return decisions, model_requests
+
+    def decide_many(self, requests: list[tuple[int, list[MoveType]]], target_tile=None):
+        # one decision per (seat, possible calls); seats sharing a model get a single forward pass
+        decisions, model_requests = self.decide_unbatched(requests, target_tile)
+        for model, indices in model_requests.values():
+            batch = [requests[i] for i in indices]
+            choices = self.predict(model, self.load_features(batch), self.load_masks(batch))
+            for i, decision in zip(indices, self.choose_moves(batch, choices)):
+                decisions[i] = decision
+
+        if requests:
+            self.curr_player_id = requests[-1][0]
+        return decisions
 
     def query_model(self, possible_calls: list[MoveType]):
-        datapoint = DataPoint()
-        self.load_input(datapoint, possible_calls)
+        return self.competitors[self.curr_player_id].decide(self, [(self.curr_player_id, possible_calls)])[0]
 
-        # query the model
-        discard_tiles, which_chi, action = \
-            self.competitors[self.curr_player_id].model.get_prediction(datapoint.torch_features())
-        discard_tiles = discard_tiles.numpy(force=True)
-        which_chi = which_chi.numpy(force=True)
-        action = action.numpy(force=True)
+    def predict(self, model, features: np.ndarray, masks: list[np.ndarray]):
+        return predict(model, features, masks)
 
-        # Zero out everything that isn't possible
-        for call in MoveType:
-            if call not in possible_calls:
-                action[call.value] = 0.
+    def load_features(self, requests: list[tuple[int, list[MoveType]]]):
+        # the tracked state of every requesting seat in one gather, then what the round keeps itself
+        features = gather_features(self.state, [p for p, _ in requests])
+        for row, (p, possible_calls) in zip(features, requests):
+            self.curr_player_id = p
+            tile_to_call = None
+            tile_origin = None
+            if any(2 <= pc.value <= 7 for pc in possible_calls):
+                tile_to_call = self.tile.id34()
+                tile_origin = self.event.from_who if self.event.from_who is not None else self.event.who
+            fill_round_features(
+                row, p, self.round_no, self.turn_no, self.dealer_id, self.prevalent_wind, self.seat_wind[p],
+                self.scores, tile_to_call, tile_origin
+            )
+        return features
+
+    def load_masks(self, requests: list[tuple[int, list[MoveType]]]):
+        # stacked (batch, 34), (batch, 3), (batch, len(MoveType)) legal masks
+        masks = [self.legal_masks(p, possible_calls) for p, possible_calls in requests]
+        return [np.stack(head_masks) for head_masks in zip(*masks)]
 
+    def legal_masks(self, p, possible_calls: list[MoveType]):
+        discard_mask = np.zeros(34, dtype=np.bool_)
         if MoveType.DISCARD in possible_calls:
-            for tile_id in range(34):
-                if not self.closed_hand_counts[self.curr_player_id][tile_id]:
-                    discard_tiles[tile_id] = 0.
-            if self.riichi_status[self.curr_player_id] == RiichiStatus.RIICHI_DISCARD:
-                for tile_id in range(34):
-                    if not self.can_riichi_discard[self.curr_player_id][tile_id]:
-                        discard_tiles[tile_id] = 0.
+            discard_mask = self.closed_hand_counts[p] > 0
+            if self.riichi_status[p] == RiichiStatus.RIICHI_DISCARD:
+                discard_mask &= self.can_riichi_discard[p]
 
-        # turn the results to probabilities
-        if MoveType.DISCARD in possible_calls and np.any(discard_tiles):
-            discard_tiles /= np.sum(discard_tiles)
+        chi_mask = self.chi_mask(p) if MoveType.CHI in possible_calls else np.zeros(3, dtype=np.bool_)
 
-        if np.any(action):
-            action /= np.sum(action)
+        action_mask = np.zeros(len(MoveType), dtype=np.bool_)
+        action_mask[[call.value for call in possible_calls]] = True
+        return discard_mask, chi_mask, action_mask
 
-        # decide what to do
-        discard_tile_id34 = np.argmax(discard_tiles, 0)
+    def chi_mask(self, p):
+        # which of CHI_SHAPES the closed hand of p can make with self.tile
+        shapes = chi_bits(self.closed_hand_bits[p], self.tile.id34())
+        return np.array([shapes & 1, shapes & 2, shapes & 4], dtype=np.bool_)
 
-        discard_tile = None
-        take_action = MoveType(np.argmax(action, 0))
+    def closed_tile(self, p, tile_id34):
+        # the highest id136 copy of tile_id34 held in the closed hand of p
+        held = self.closed_hand_tiles[p][tile_id34 * 4:tile_id34 * 4 + 4]
+        return Tile.of(tile_id34 * 4 + 3 - int(np.argmax(held[::-1])))
+
+    def choose_moves(self, requests: list[tuple[int, list[MoveType]]], choices):
+        decisions = []
+        for i, (p, possible_calls) in enumerate(requests):
+            self.curr_player_id = p
+            decisions.append(self.choose_move(possible_calls, *(choice[i] for choice in choices)))
+        return decisions
 
+    def choose_move(self, possible_calls: list[MoveType], discard_tile_id34, which_chi_id, action_id):
+        # the choices are already restricted to legal options
+        discard_tile = None
         if MoveType.DISCARD in possible_calls:
-            if self.closed_hand_counts[self.curr_player_id][discard_tile_id34]:
-                # find the actual tile
-                for tid136 in range(discard_tile_id34 * 4 + 3, discard_tile_id34 * 4 - 1, -1):
-                    discard_tile = Tile(tid136)
-                    if discard_tile in self.closed_hands[self.curr_player_id]:
-                        break
-            else:
-                # model is confused and has no idea what to do
-                discard_tile = random.choice(self.closed_hands[self.curr_player_id])
+            discard_tile = self.closed_tile(self.curr_player_id, discard_tile_id34)
+
+        # which chi only means something for a chi, any other action ignores it
+        which_chi = [0] * 3
+        if action_id == MoveType.CHI.value:
+            which_chi[which_chi_id] = 1
+        return discard_tile, which_chi, MoveType(int(action_id))
+
+    def record(self, kind, seat=-1, tile=-1, value=0):
+        if self.recorder is not None:
+            self.recorder.write(kind, seat, tile, value)
 
-        # decide what to do
-        return discard_tile, which_chi, take_action
+    def record_round_start(self):
+        self.record(RecordKind.ROUND_START, self.dealer_id, value=self.round_no)
+        for p in range(4):
+            self.record(RecordKind.SCORE, p, value=self.scores[p])
+        for p in range(4):
+            for tile in self.closed_hands[p]:
+                self.record(RecordKind.DEAL, p, tile.id136())
+        for tile in self.dora_indicators[:self.dora_revealed_no]:
+            self.record(RecordKind.DORA, tile=tile.id136())
+        for tile in self.uradora_indicators:
+            self.record(RecordKind.URADORA, tile=tile.id136())
+
+    def record_round_end(self):
+        self.record(RecordKind.ROUND_END, value=int(self.dealer_won))
+        for p in range(4):
+            self.record(RecordKind.SCORE, p, value=self.scores[p])
 
     def run(self):
+        game = self.play()
+        try:
+            requests, target_tile = next(game)
+            while True:
+                requests, target_tile = game.send(self.decide_many(requests, target_tile))
+        except StopIteration as stop:
+            return stop.value
+
+    def play(self):
+        # yields (requests, target_tile) whenever decisions are needed and expects them sent back,
+        # so whoever drives the round decides how to batch them (see LockstepRounds)
         self.event = Event(EventType.DRAW_TILE, self.dealer_id)
+        if self.recorder is not None:
+            self.record_round_start()
+        return (yield from self.resume())
+
+    def resume(self):
+        # plays on from the current event, a clone of a round waiting for decisions asks for them again
         while not self.finished:
             match self.event.what:
                 case EventType.DRAW_TILE:
-                    self.handle_draw_tile()
+                    yield from self.handle_draw_tile()
                 case EventType.DISCARD_TILE:
-                    self.handle_discard_tile()
+                    yield from self.handle_discard_tile()
                 case EventType.TILE_DISCARDED:
-                    self.handle_tile_discarded()
+                    yield from self.handle_tile_discarded()
                 case EventType.ROUND_DRAW:
                     self.handle_round_draw()
                 case EventType.WALL_EXHAUSTED:
@@ -566,29 +841,36 @@ class Round:
                 case EventType.WINNER:
                     self.handle_winner()
                 case EventType.AFTER_KAN:
-                    self.handle_after_kan()
+                    yield from self.handle_after_kan()
+        if self.recorder is not None:
+            self.record_round_end()
         return self.scores, self.dealer_won, None
 
+    def request_decisions(self, requests: list[tuple[int, list[MoveType]]], target_tile=None):
+        if not requests:
+            return []
+        return (yield requests, target_tile)
+
     def handle_draw_tile(self):
         # draw the tile and related game logic
         self.curr_player_id = self.event.who
-        if self.board:
-            self.changed_curr_player_id()
-            self.delay(delay_human=True)
+        self.changed_curr_player_id()
+        self.delay(delay_human=True)
 
         self.track_draw_tile()
         if self.event.what != EventType.DRAW_TILE:
             return
+        self.record(MoveType.DRAW.value, self.curr_player_id, self.tile.id136())
 
-        # check for nine orphans draw
-        if self.first_move[self.curr_player_id] and sum(
-                [self.closed_hand_counts[self.curr_player_id][i] for i in
-                 mc.TERMINAL_INDICES + list(range(26, 34))]) >= 9:
+        # check for nine orphans draw: nine different terminal and honor kinds
+        if self.first_move[self.curr_player_id] and \
+                np.count_nonzero(self.closed_hand_counts[self.curr_player_id][ORPHAN_INDICES]) >= 9:
 
             possible_calls = [MoveType.PASS, MoveType.DRAW]
-            _, _, action = self.decide(possible_calls)
+            (_, _, action), = yield from self.request_decisions([(self.curr_player_id, possible_calls)])
 
             if action == MoveType.DRAW:
+                self.record(MoveType.DRAW.value, self.curr_player_id)
                 self.event = Event(EventType.ROUND_DRAW, -1)
                 return
 
@@ -615,10 +897,9 @@ class Round:
 
         if is_riichi_possible:
             self.set_riichi_discards()
-            if self.gui is not None:
-                self.board.restrict_tiles(self.can_riichi_discard[self.curr_player_id])
+            self.restrict_tiles(self.can_riichi_discard[self.curr_player_id])
 
-        _, _, decision = self.decide(possible_calls)
+        (_, _, decision), = yield from self.request_decisions([(self.curr_player_id, possible_calls)])
 
         # game logic based on decision made
         match decision:
@@ -634,8 +915,7 @@ class Round:
         # update trackers
         self.after_a_kan = False
 
-        if self.gui is not None:
-            self.board.lift_restriction_tiles()
+        self.lift_restriction_tiles()
 
     def after_riichi_discard(self):
         pass  # nothing but inheriting class needs it
@@ -657,11 +937,15 @@ class Round:
         else:
             self.delay()
             # query the model what to discard
-            discard_tile, _, _ = self.decide([MoveType.DISCARD])
+            (discard_tile, _, _), = yield from self.request_decisions([(self.curr_player_id, [MoveType.DISCARD])])
 
         # Actually discard decided tile
+        self.record(MoveType.DISCARD.value, self.curr_player_id, discard_tile.id136())
         self.closed_hand_counts[self.curr_player_id][discard_tile.id34()] -= 1
+        self.closed_hand_bits[self.curr_player_id] -= tile_bit(discard_tile.id34())
         self.closed_hands[self.curr_player_id].remove(discard_tile)
+        self.closed_hand_tiles[self.curr_player_id][discard_tile.id136()] = False
+        self.hand_changed(self.curr_player_id)
         self.discard_piles[self.curr_player_id].append(discard_tile)
         self.discard_orders[self.curr_player_id][discard_tile.id34()] = self.turn_no
 
@@ -671,27 +955,10 @@ class Round:
 
         # Tile reveal to other players handled in tile_discarded
 
-        self.waiting_tiles[self.curr_player_id] = [False] * 34
-        # For furiten tracking: if ready hand, calculate what tiles needed to win
-        if self.furiten_status[self.curr_player_id] == FuritenStatus.DEFAULT and 0 == correct_shanten(
-                [self.closed_hand_counts[self.curr_player_id][i] +
-                 self.open_hand_counts[self.curr_player_id][i]
-                 for i in range(34)],
-                self.melds[self.curr_player_id]
-        ):
-            for i in range(34):
-                if self.closed_hand_counts[self.curr_player_id][i]:
-                    self.waiting_tiles[self.curr_player_id][i] = True
-                    if i % 9 > 0 and i < 27 and self.closed_hand_counts[self.curr_player_id][i + 1]:
-                        self.waiting_tiles[self.curr_player_id][i - 1] = True
-                    if i % 9 < 8 and i < 27 and self.closed_hand_counts[self.curr_player_id][i - 1]:
-                        self.waiting_tiles[self.curr_player_id][i + 1] = True
-
-            for i in range(34):
-                self.waiting_tiles[self.curr_player_id][i] = \
-                    self.waiting_tiles[self.curr_player_id][i] and \
-                    self.hidden_tile_counts[self.curr_player_id][i] and \
-                    self.is_win_possible(fake_tile=Tile(i * 4))
+        # the hand stays as is until this seat acts again, so its waits are kept ready for ron checks
+        self.update_waits(self.curr_player_id)
+
+        self.track_waiting_tiles(self.curr_player_id)
 
         if self.discard_after_kan and self.open_kan:
             self.reveal_dora()
@@ -707,24 +974,32 @@ class Round:
             self.furiten_status[self.curr_player_id] = FuritenStatus.DEFAULT
 
         # furiten because of discard?
-        if self.furiten_status[self.curr_player_id] != FuritenStatus.PERM_FURITEN and any(
-            self.waiting_tiles[self.curr_player_id][i] and self.discard_orders[self.curr_player_id][i]
-            for i in range(34)
-        ):
+        if self.furiten_status[self.curr_player_id] != FuritenStatus.PERM_FURITEN and \
+                (self.waiting_tiles[self.curr_player_id] & (self.discard_orders[self.curr_player_id] > 0)).any():
             self.furiten_status[self.curr_player_id] = FuritenStatus.TEMP_FURITEN
 
-        if self.board:
-            self.update_board(play_sound_name="tile_discard")
+        self.update_board(play_sound_name="tile_discard")
 
         self.event = Event(EventType.TILE_DISCARDED, self.curr_player_id)
 
+    def track_waiting_tiles(self, p):
+        self.waiting_tiles[p] = False
+        # For furiten tracking: if ready hand, calculate what tiles needed to win
+        if self.furiten_status[p] == FuritenStatus.DEFAULT and self.tenpai[p]:
+            # closed hands always have menzen tsumo, only open hands need their yaku checked
+            waits = [i for i in self.waits[p] if self.hidden_tile_counts[p][i]]
+            if self.hand_is_closed[p]:
+                self.waiting_tiles[p][waits] = True
+            elif waits:
+                self.waiting_tiles[p][waits] = [r.error is None for r in self.get_wait_results(p, waits)]
+
     def handle_tile_discarded(self):
         from_who = self.event.who
         decision = MoveType.PASS
         self.tile = self.discard_piles[from_who][-1]
 
         # check for four winds draw
-        if self.turn_no == 4 and any(all(self.discard_orders[p][wind] for p in range(4)) for wind in range(27, 31)):
+        if self.turn_no == 4 and self.discard_orders[:, 27:31].all(axis=0).any():
             self.event = Event(EventType.ROUND_DRAW, -1)
             return
 
@@ -744,39 +1019,23 @@ class Round:
                 self.red5_hidden[p][self.tile.id34() // 9] = 0
 
             # get possible chi
-            if p == ((from_who + 1) % 4) and self.tile.id34() < 27 and not self.hand_in_riichi[p]:
-                order_in_set = self.tile.id34() % 9
-                if (
-                    order_in_set > 1 and
-                    self.closed_hand_counts[p][self.tile.id34() - 2] and
-                    self.closed_hand_counts[p][self.tile.id34() - 1]
-                ):
-                    possible_chi[p].append((-2, -1))
-                if (
-                    0 < order_in_set < 8 and
-                    self.closed_hand_counts[p][self.tile.id34() - 1] and
-                    self.closed_hand_counts[p][self.tile.id34() + 1]
-                ):
-                    possible_chi[p].append((-1, 1))
-                if (
-                    order_in_set < 7 and
-                    self.closed_hand_counts[p][self.tile.id34() + 1] and
-                    self.closed_hand_counts[p][self.tile.id34() + 2]
-                ):
-                    possible_chi[p].append((1, 2))
+            if p == ((from_who + 1) % 4) and not self.hand_in_riichi[p]:
+                shapes = chi_bits(self.closed_hand_bits[p], self.tile.id34())
+                possible_chi[p] = [shape for i, shape in enumerate(CHI_SHAPES) if shapes >> i & 1]
 
+            held = count_of(self.closed_hand_bits[p], self.tile.id34())
             is_chi_possible[p] = bool(possible_chi[p])
-            is_pon_possible[p] = self.closed_hand_counts[p][self.tile.id34()] >= 2 and not self.hand_in_riichi[p]
-            is_kan_possible[p] = self.closed_hand_counts[p][self.tile.id34()] == 3
+            is_pon_possible[p] = held >= 2 and not self.hand_in_riichi[p]
+            is_kan_possible[p] = held == 3 and self.is_kan_left()
             is_ron_possible[p] = self.is_ron_possible()
 
         wants = [MoveType.PASS for _ in range(4)]
         chi_prob = [[] for _ in range(4)]
+        requests = []
         for p in range(4):
             if p == from_who or \
                     not (is_chi_possible[p] or is_pon_possible[p] or is_kan_possible[p] or is_ron_possible[p]):
                 continue
-            self.curr_player_id = p
 
             possible_calls = [MoveType.PASS]
             if is_chi_possible[p]:
@@ -787,8 +1046,10 @@ class Round:
                 possible_calls.append(MoveType.KAN)
             if is_ron_possible[p]:
                 possible_calls.append(MoveType.RON)
+            requests.append((p, possible_calls))
 
-            _, wc, ac = self.decide(possible_calls)
+        decisions = yield from self.request_decisions(requests)
+        for (p, _), (_, wc, ac) in zip(requests, decisions):
             chi_prob[p] = wc
             wants[p] = ac
 
@@ -798,7 +1059,10 @@ class Round:
             for p in range(4):
                 if wants[p] == MoveType.RON:
                     self.closed_hands[p].append(self.tile)
+                    self.closed_hand_tiles[p][self.tile.id136()] = True
                     self.closed_hand_counts[p][self.tile.id34()] += 1
+                    self.closed_hand_bits[p] += tile_bit(self.tile.id34())
+                    self.hand_changed(p)
             self.event = Event(EventType.WINNER, [p for p in range(4) if wants[p] == MoveType.RON], from_who)
             return
         elif MoveType.KAN in wants or MoveType.PON in wants:
@@ -817,7 +1081,7 @@ class Round:
             self.changed_curr_player_id()
 
         # the last discard is not a winning tile, check for 4 kan draw or 4 riichi draw
-        if self.four_quads_draw_flag or all(self.hand_in_riichi):
+        if self.four_quads_draw_flag or self.hand_in_riichi.all():
             self.event = Event(EventType.ROUND_DRAW, -1)
             return
 
@@ -854,11 +1118,7 @@ class Round:
 
     def handle_round_draw(self):
         # no score change, same dealer next round
-        if self.board:
-            self.board.show_scores(self.scores, [0] * 4, "Draw")
-            while not self.board.score_display.ready_to_continue:
-                if not self.gui.playing:
-                    exit()
+        self.show_scores([0] * 4, "Draw")
 
         self.dealer_won = True
         self.finished = True
@@ -873,6 +1133,8 @@ class Round:
             if p == self.event.who:
                 continue
             self.curr_player_id = p
+            if not self.waits_on(p, self.tile.id34()):
+                continue
             hand_result = self.get_hand_result(tsumo=False, fake_tile=self.tile)
             is_ron_possible[p] = hand_result.error is None and \
                                  (self.open_kan or any([y.name == "Kokushi Musou" for y in hand_result.yaku]))
@@ -884,13 +1146,11 @@ class Round:
             return
 
         wants = [MoveType.PASS for _ in range(4)]
-        for p in range(4):
-            if p == self.event.who or not is_ron_possible[p]:
-                continue
-            self.curr_player_id = p
-
-            possible_calls = [MoveType.PASS, MoveType.RON]
-            _, _, wants[p] = self.decide(possible_calls, target_tile=self.tile)
+        requests = [(p, [MoveType.PASS, MoveType.RON]) for p in range(4)
+                    if p != self.event.who and is_ron_possible[p]]
+        decisions = yield from self.request_decisions(requests, target_tile=self.tile)
+        for (p, _), (_, _, ac) in zip(requests, decisions):
+            wants[p] = ac
 
         # update hand status trackers
         for p in range(4):
@@ -902,7 +1162,10 @@ class Round:
             for p in range(4):
                 if wants[p] == MoveType.RON:
                     self.closed_hands[p].append(self.tile)
+                    self.closed_hand_tiles[p][self.tile.id136()] = True
                     self.closed_hand_counts[p][self.tile.id34()] += 1
+                    self.closed_hand_bits[p] += tile_bit(self.tile.id34())
+                    self.hand_changed(p)
 
             self.event = Event(
                 EventType.WINNER,
@@ -914,7 +1177,7 @@ class Round:
         # check nagashi mangan yaku conditions
         for p in range(4):
             self.nagashi_mangan[p] &= \
-                all(not self.discard_orders[i] or i in mc.TERMINAL_INDICES + list(range(26, 34)) for i in range(34))
+                not np.delete(self.discard_orders[p], mc.TERMINAL_INDICES + mc.HONOR_INDICES).any()
 
             if self.nagashi_mangan[p]:
                 self.event = Event(EventType.WINNER, p, p)
@@ -923,8 +1186,7 @@ class Round:
         has_tenpai = [0] * 4  # ready hand
         score_change = [0] * 4
         for p in range(4):
-            has_tenpai[p] = int(correct_shanten([self.closed_hand_counts[p][i] +
-                                                 self.open_hand_counts[p][i] for i in range(34)], self.melds[p]) <= 0)
+            has_tenpai[p] = int(self.is_tenpai(p))
         match sum(has_tenpai):
             case 3:
                 for p in range(4):
@@ -939,11 +1201,7 @@ class Round:
         for p in range(4):
             self.scores[p] += score_change[p]
 
-        if self.board:
-            self.board.show_scores(self.scores, score_change, "Wall exhausted")
-            while not self.board.score_display.ready_to_continue:
-                if not self.gui.playing:
-                    exit()
+        self.show_scores(score_change, "Wall exhausted")
 
         self.dealer_won = has_tenpai[self.dealer_id]
         self.finished = True
@@ -979,17 +1237,15 @@ class Round:
             is_paarenchan = False  # this rule variation doesn't use parenchan yaku
 
             # other info
-            seat_wind = wind_from_int(self.seat_wind[p])
-            prevalent_wind = wind_from_int(self.prevalent_wind)
             # riichi sticks (no of bets placed)
             kyoutaku_number = sum(rs == RiichiStatus.RIICHI for rs in self.riichi_status)
             tsumi_number = 0  # penalty sticks
-            options = OptionalRules(has_aka_dora=True, has_open_tanyao=True)
 
-            config = HandConfig(is_tsumo, is_riichi, is_ippatsu, is_rinshan, is_chankan, is_haitei,
-                                is_houtei, is_daburu_riichi, is_nagashi_mangan, is_tenhou, is_renhou,
-                                is_chiihou, is_open_riichi, seat_wind, prevalent_wind, kyoutaku_number,
-                                tsumi_number, is_paarenchan, options)
+            config = scoring_service.win_config(self.seat_wind[p], self.prevalent_wind, is_tsumo, is_riichi,
+                                                is_ippatsu, is_rinshan, is_chankan, is_haitei, is_houtei,
+                                                is_daburu_riichi, is_nagashi_mangan, is_tenhou, is_renhou,
+                                                is_chiihou, is_open_riichi, kyoutaku_number, tsumi_number,
+                                                is_paarenchan)
             hand_result = self.get_hand_result(config=config)
 
             # show result
@@ -1009,6 +1265,7 @@ class Round:
             '''
 
             points_gained[p] = hand_result.cost['main'] // 100
+            self.record((MoveType.TSUMO if is_tsumo else MoveType.RON).value, p, value=dealt_in)
 
         total_plus = sum(points_gained)
 
@@ -1028,15 +1285,7 @@ class Round:
         for p in range(4):
             self.scores[p] += points_gained[p]
 
-        if self.board:
-            self.board.show_scores(
-                self.scores,
-                points_gained,
-                yaku_text.rstrip("\n"),
-            )
-            while not self.board.score_display.ready_to_continue:
-                if not self.gui.playing:
-                    exit()
+        self.show_scores(points_gained, yaku_text.rstrip("\n"))
 
         self.dealer_won = self.dealer_id in winners
         self.finished = True
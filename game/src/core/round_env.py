@@ -0,0 +1,101 @@
+import numpy as np
+
+from game.src.core.round import Round
+from game.src.core.sim_round import SimRound
+from game.src.core.player import Player
+from game.src.core.mahjong_enums import MoveType
+from game.src.core.wall import WallGenerator
+
+
+# What the deciding seat sees, refilled in place on every step
+class Observation:
+    def __init__(self, n_features):
+        self.features = np.zeros(n_features, dtype=np.float32)
+        self.discard_mask = np.zeros(34, dtype=np.bool_)
+        self.chi_mask = np.zeros(3, dtype=np.bool_)
+        self.action_mask = np.zeros(len(MoveType), dtype=np.bool_)
+        self.seat = -1
+        self.possible_calls: list[MoveType] = []
+        self.target_tile = None
+
+
+# Round driven from the outside: reset() starts a round, step(action) answers the pending decision.
+# Decisions the round asks for together are handed out one seat at a time and sent back together.
+class RoundEnv:
+    def __init__(self, new_round=None, seed=0):
+        # new_round: callable returning a fresh Round, defaults to a headless East round on seeded walls
+        if new_round is None:
+            walls = WallGenerator(seed if seed else None)
+            new_round = lambda: SimRound(
+                [Player() for _ in range(4)], [250] * 4, 0, 0, walls.next_deck(), walls.round_rng()
+            )
+        self.new_round = new_round
+        self.round: Round | None = None
+        self.game = None
+        self.observation: Observation | None = None
+        self.requests: list[tuple[int, list[MoveType]]] = []
+        self.target_tile = None
+        self.decisions = []
+        self.result = None  # (scores, dealer_won, data) once the round is over
+
+    def reset(self) -> Observation | None:
+        self.round = self.new_round()
+        self.game = self.round.play()
+        self.result = None
+        self.advance(None)
+        return None if self.done() else self.observation
+
+    def step(self, action) -> tuple[Observation | None, bool]:
+        # action: (discard tile id34, which chi, MoveType value), the same indices the model heads choose
+        if self.game is None or self.done():
+            raise ValueError("no decision is pending, call reset() to start a round")
+        discard_tile_id34, which_chi_id, action_id = (int(a) for a in action)
+        observation = self.observation
+        if not 0 <= action_id < len(observation.action_mask) or not observation.action_mask[action_id] or \
+                (action_id == MoveType.DISCARD.value and not (
+                    0 <= discard_tile_id34 < len(observation.discard_mask) and
+                    observation.discard_mask[discard_tile_id34]
+                )) or \
+                (action_id == MoveType.CHI.value and not (
+                    0 <= which_chi_id < len(observation.chi_mask) and observation.chi_mask[which_chi_id]
+                )):
+            raise ValueError("illegal action {} for seat {}".format(action, observation.seat))
+
+        self.round.curr_player_id = observation.seat
+        self.decisions.append(
+            self.round.choose_move(observation.possible_calls, discard_tile_id34, which_chi_id, action_id)
+        )
+        if len(self.decisions) == len(self.requests):
+            self.round.curr_player_id = self.requests[-1][0]
+            self.advance(self.decisions)
+        else:
+            self.observe()
+        return (None if self.done() else self.observation), self.done()
+
+    def done(self):
+        return self.result is not None
+
+    def advance(self, decisions):
+        try:
+            self.requests, self.target_tile = self.game.send(decisions)
+        except StopIteration as stop:
+            self.result = stop.value
+            self.requests = []
+            return
+        self.decisions = []
+        self.observe()
+
+    def observe(self):
+        p, possible_calls = self.requests[len(self.decisions)]
+        features = self.round.load_features([(p, possible_calls)])[0]
+        if self.observation is None:
+            self.observation = Observation(len(features))
+        np.copyto(self.observation.features, features)
+        for mask, legal in zip(
+                (self.observation.discard_mask, self.observation.chi_mask, self.observation.action_mask),
+                self.round.legal_masks(p, possible_calls)
+        ):
+            np.copyto(mask, legal)
+        self.observation.seat = p
+        self.observation.possible_calls = possible_calls
+        self.observation.target_tile = self.target_tile
@@ -0,0 +1,82 @@
+import numpy as np
+
+from game.src.core.round_state import RoundState
+
+
+# Model input rows for any seats at once, laid out as FEATURE_BLOCKS below.
+# Everything RoundState tracks is gathered straight from its two buffers through per-seat index maps, seat-relative
+# blocks already rolled, so rows always agree with the state (restored or determinized ones too).
+# The few values kept on the Round itself are written per decision.
+FEATURE_BLOCKS = (
+    # name, size, how a seat sees the RoundState field: its own row, rolled to it or whole; None if not in RoundState
+    ("round_no", 1, None), ("turn_no", 1, None), ("dealer", 4, None), ("prevalent_wind", 4, None),
+    ("seat_wind", 4, None), ("closed_hand_counts", 34, "own"), ("open_hand_counts", 4 * 34, "rolled"),
+    ("discard_orders", 4 * 34, "rolled"), ("hidden_tile_counts", 34, "own"), ("visible_dora", 34, "whole"),
+    ("hand_is_closed", 4, "rolled"), ("hand_in_riichi", 4, "rolled"), ("scores", 4, None),
+    ("red5_closed_hand", 3, "own"), ("red5_open_hand", 4 * 3, "rolled"), ("red5_discarded", 3, "whole"),
+    ("red5_hidden", 3, "own"), ("tile_to_call", 34, None), ("tile_origin", 4, None),
+)
+
+
+def _offsets():
+    offsets = {}
+    n_features = 0
+    for name, size, _ in FEATURE_BLOCKS:
+        offsets[name] = n_features
+        n_features += size
+    return offsets, n_features
+
+
+OFFSETS, N_FEATURES = _offsets()
+ROUND_NO, TURN_NO, DEALER, PREVALENT_WIND, SEAT_WIND, SCORES, TILE_TO_CALL, TILE_ORIGIN = (
+    OFFSETS[name] for name in (
+        "round_no", "turn_no", "dealer", "prevalent_wind", "seat_wind", "scores", "tile_to_call", "tile_origin"
+    )
+)
+
+
+def _index_map(layout):
+    # feature positions filled from one RoundState buffer, and per seat the buffer elements they come from
+    fields = {name: (start, stop, shape) for name, start, stop, shape, _, _ in layout}
+    positions = []
+    elements = [[] for _ in range(4)]
+    for name, size, seen in FEATURE_BLOCKS:
+        if seen is None or name not in fields:
+            continue
+        start, stop, shape = fields[name]
+        positions.extend(range(OFFSETS[name], OFFSETS[name] + size))
+        for p in range(4):
+            indices = np.arange(start, stop).reshape(shape)
+            if seen == "own":
+                indices = indices[p]
+            elif seen == "rolled":
+                indices = np.roll(indices, -p, axis=0)
+            elements[p].extend(indices.ravel().tolist())
+    return np.array(positions, dtype=np.intp), np.array(elements, dtype=np.intp)
+
+
+BYTE_POSITIONS, BYTE_ELEMENTS = _index_map(RoundState.BYTE_LAYOUT)
+SHORT_POSITIONS, SHORT_ELEMENTS = _index_map(RoundState.SHORT_LAYOUT)
+
+
+def gather_features(state: RoundState, seats: list[int]) -> np.ndarray:
+    # (len(seats), N_FEATURES), the blocks not in RoundState left zero
+    rows = np.zeros((len(seats), N_FEATURES), dtype=np.float32)
+    rows[:, BYTE_POSITIONS] = state.byte_buffer[BYTE_ELEMENTS[seats]]
+    rows[:, SHORT_POSITIONS] = state.short_buffer[SHORT_ELEMENTS[seats]]
+    return rows
+
+
+def fill_round_features(row: np.ndarray, p, round_no, turn_no, dealer, prevalent_wind, seat_wind, scores,
+                        tile_to_call=None, tile_origin=None):
+    # the blocks of a seat's row not tracked in RoundState, seat-relative ones rolled to p
+    row[ROUND_NO] = round_no
+    row[TURN_NO] = turn_no
+    row[DEALER + (dealer - p) % 4] = 1
+    row[PREVALENT_WIND + prevalent_wind] = 1
+    row[SEAT_WIND + seat_wind] = 1
+    row[SCORES:SCORES + 4] = list(scores[p:]) + list(scores[:p])
+    if tile_to_call is not None:
+        row[TILE_TO_CALL + tile_to_call] = 1
+    if tile_origin is not None:
+        row[TILE_ORIGIN + (tile_origin - p) % 4] = 1
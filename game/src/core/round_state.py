@@ -0,0 +1,81 @@
+import numpy as np
+from math import prod
+
+
+# Per-round tile tracking as views into two contiguous buffers: cheap to copy, hash and pickle
+class RoundState:
+    # name, shape, initial value, dtype
+    BYTE_FIELDS = (
+        ("closed_hand_counts", (4, 34), 0, np.int8),
+        ("closed_hand_tiles", (4, 136), 0, np.bool_),  # which exact tiles each closed hand holds
+        ("open_hand_counts", (4, 34), 0, np.int8),
+        ("hidden_tile_counts", (4, 34), 4, np.int8),
+        ("hand_is_closed", (4,), 1, np.int8),
+        ("visible_dora", (34,), 0, np.int8),
+        ("red5_closed_hand", (4, 3), 0, np.int8),
+        ("red5_open_hand", (4, 3), 0, np.int8),
+        ("red5_discarded", (3,), 0, np.int8),
+        ("red5_hidden", (4, 3), 1, np.int8),
+        ("waiting_tiles", (4, 34), 0, np.bool_),
+        ("can_riichi_discard", (4, 34), 0, np.bool_),
+    )
+    SHORT_FIELDS = (
+        ("discard_orders", (4, 34), 0, np.int16),
+        ("hand_in_riichi", (4,), 0, np.int16),
+    )
+
+    @staticmethod
+    def layout(fields):
+        # name, start, stop, shape, fill, dtype
+        result = []
+        offset = 0
+        for name, shape, fill, dtype in fields:
+            size = prod(shape)
+            result.append((name, offset, offset + size, shape, fill, dtype))
+            offset += size
+        return tuple(result), offset
+
+    def __init__(self, byte_buffer: np.ndarray = None, short_buffer: np.ndarray = None):
+        init = byte_buffer is None
+        self.byte_buffer = np.empty(RoundState.BYTE_SIZE, dtype=np.int8) if init else byte_buffer
+        self.short_buffer = np.empty(RoundState.SHORT_SIZE, dtype=np.int16) if init else short_buffer
+        self.bind_fields(self.byte_buffer, RoundState.BYTE_LAYOUT, init)
+        self.bind_fields(self.short_buffer, RoundState.SHORT_LAYOUT, init)
+
+    def bind_fields(self, buffer, layout, init):
+        for name, start, stop, shape, fill, dtype in layout:
+            view = buffer[start:stop].view(dtype).reshape(shape)
+            if init:
+                view[...] = fill
+            setattr(self, name, view)
+
+    def copy(self, writeable=True):
+        # a read-only copy has read-only views too, the buffers are locked before they are bound
+        byte_buffer = self.byte_buffer.copy()
+        short_buffer = self.short_buffer.copy()
+        byte_buffer.flags.writeable = writeable
+        short_buffer.flags.writeable = writeable
+        return RoundState(byte_buffer, short_buffer)
+
+    def copy_from(self, other: "RoundState"):
+        # in place, so views held by a Round stay valid
+        np.copyto(self.byte_buffer, other.byte_buffer)
+        np.copyto(self.short_buffer, other.short_buffer)
+
+    def key(self):
+        return self.byte_buffer.tobytes() + self.short_buffer.tobytes()
+
+    def __eq__(self, other):
+        if type(other) != RoundState:
+            return False
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __reduce__(self):
+        return RoundState, (self.byte_buffer, self.short_buffer)
+
+
+RoundState.BYTE_LAYOUT, RoundState.BYTE_SIZE = RoundState.layout(RoundState.BYTE_FIELDS)
+RoundState.SHORT_LAYOUT, RoundState.SHORT_SIZE = RoundState.layout(RoundState.SHORT_FIELDS)
@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from mahjong.meld import Meld
+from mahjong.hand_calculating.hand import HandCalculator
+from mahjong.hand_calculating.hand_config import HandConfig, OptionalRules
+import mahjong.constants as mc
+
+
+CONFIG_FIELDS = (
+    "is_tsumo", "is_riichi", "is_ippatsu", "is_rinshan", "is_chankan", "is_haitei", "is_houtei",
+    "is_daburu_riichi", "is_nagashi_mangan", "is_tenhou", "is_renhou", "is_chiihou", "is_open_riichi",
+    "player_wind", "round_wind", "kyoutaku_number", "tsumi_number", "paarenchan",
+)
+OPTION_FIELDS = (
+    "has_open_tanyao", "has_aka_dora", "has_double_yakuman", "kazoe_limit", "kiriage", "fu_for_open_pinfu",
+    "fu_for_pinfu_tsumo", "renhou_as_yakuman", "has_daisharin", "has_daisharin_other_suits",
+    "has_sashikomi_yakuman", "limit_to_sextuple_yakuman", "has_daichisei", "paarenchan_needs_yaku",
+)
+
+
+def config_key(config: HandConfig):
+    return tuple(getattr(config, field) for field in CONFIG_FIELDS) + \
+        tuple(getattr(config.options, field) for field in OPTION_FIELDS)
+
+
+def melds_key(melds: list[Meld]):
+    return tuple((meld.type, tuple(meld.tiles), meld.opened) for meld in melds)
+
+
+# Bounded LRU cache of HandCalculator results, keyed on the canonical hand and the scoring config
+class HandValueCache:
+    def __init__(self, maxsize=1 << 16):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def estimate_hand_value(self, calculator: HandCalculator, tiles136: list[int], win_tile136: int,
+                            melds: list[Meld], config: HandConfig, config_id: tuple = None):
+        # config_id: config_key(config), if already known
+        if config_id is None:
+            config_id = config_key(config)
+        key = (tuple(sorted(tiles136)), win_tile136, melds_key(melds), config_id)
+        hand_result = self.entries.get(key)
+        if hand_result is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return hand_result
+
+        self.misses += 1
+        hand_result = calculator.estimate_hand_value(tiles=tiles136, win_tile=win_tile136, melds=melds, config=config)
+        self.entries[key] = hand_result
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return hand_result
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+hand_value_cache = HandValueCache()
+
+
+# One HandCalculator per process, with the scoring configs built once and shared by every round
+class ScoringService:
+    WINDS = (mc.EAST, mc.SOUTH, mc.WEST, mc.NORTH)
+
+    def __init__(self, cache: HandValueCache):
+        self.calculator = HandCalculator()
+        self.cache = cache
+
+        # legality probes: (seat wind, prevalent wind, tsumo, riichi) -> (config, config key)
+        probe_options = OptionalRules(has_open_tanyao=True)
+        self.probe_configs = {}
+        for seat_wind in range(4):
+            for prevalent_wind in range(4):
+                for is_tsumo in (False, True):
+                    for is_riichi in (False, True):
+                        config = HandConfig(
+                            is_tsumo=is_tsumo,
+                            is_riichi=is_riichi,
+                            player_wind=ScoringService.WINDS[seat_wind],
+                            round_wind=ScoringService.WINDS[prevalent_wind],
+                            options=probe_options,
+                        )
+                        self.probe_configs[seat_wind, prevalent_wind, is_tsumo, is_riichi] = \
+                            (config, config_key(config))
+
+        # final scoring of a win, built on first use
+        self.win_options = OptionalRules(has_aka_dora=True, has_open_tanyao=True)
+        self.win_configs = {}
+
+    def probe_config(self, seat_wind: int, prevalent_wind: int, is_tsumo: bool, is_riichi: bool):
+        return self.probe_configs[seat_wind, prevalent_wind, is_tsumo, is_riichi]
+
+    def win_config(self, seat_wind: int, prevalent_wind: int, *flags):
+        # flags: is_tsumo ... is_chiihou, is_open_riichi, kyoutaku_number, tsumi_number, is_paarenchan,
+        # in HandConfig argument order around the winds
+        key = (seat_wind, prevalent_wind) + flags
+        config = self.win_configs.get(key)
+        if config is None:
+            (is_tsumo, is_riichi, is_ippatsu, is_rinshan, is_chankan, is_haitei, is_houtei, is_daburu_riichi,
+             is_nagashi_mangan, is_tenhou, is_renhou, is_chiihou, is_open_riichi, kyoutaku_number, tsumi_number,
+             is_paarenchan) = flags
+            hand_config = HandConfig(
+                is_tsumo, is_riichi, is_ippatsu, is_rinshan, is_chankan, is_haitei, is_houtei, is_daburu_riichi,
+                is_nagashi_mangan, is_tenhou, is_renhou, is_chiihou, is_open_riichi,
+                ScoringService.WINDS[seat_wind], ScoringService.WINDS[prevalent_wind],
+                kyoutaku_number, tsumi_number, is_paarenchan, self.win_options
+            )
+            config = (hand_config, config_key(hand_config))
+            self.win_configs[key] = config
+        return config
+
+    def estimate_hand_value(self, tiles136: list[int], win_tile136: int, melds: list[Meld], config, config_id=None):
+        return self.cache.estimate_hand_value(self.calculator, tiles136, win_tile136, melds, config, config_id)
+
+    def estimate_hand_values(self, hands: list[tuple[list[int], int, list[Meld], HandConfig, tuple]]):
+        # hands: (tiles136, win_tile136, melds, config, config key or None)
+        return [self.estimate_hand_value(*hand) for hand in hands]
+
+
+scoring_service = ScoringService(hand_value_cache)
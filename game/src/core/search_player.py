@@ -0,0 +1,127 @@
+import os
+import numpy as np
+from time import time, perf_counter
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from game.src.core.player import Player
+from game.src.core.heuristic_player import HeuristicPlayer
+from game.src.core.mahjong_enums import MoveType
+
+
+RESULT_SLACK = 0.05  # seconds past the deadline a pool gets to hand back what its workers played
+
+
+def rollout(rnd, p, discard_tile_id34, deadline=None):
+    # plays a round waiting for the discard of p out, returns how much the score of p changed,
+    # or None if the deadline (wall clock) passes first
+    score_before = rnd.scores[p]
+    game = rnd.resume()
+    try:
+        requests, target_tile = next(game)
+        rnd.curr_player_id = p
+        decisions = [rnd.choose_move([MoveType.DISCARD], discard_tile_id34, 0, MoveType.DISCARD.value)]
+        while True:
+            if deadline is not None and time() >= deadline:
+                return None
+            requests, target_tile = game.send(decisions)
+            decisions = rnd.decide_many(requests, target_tile)
+    except StopIteration:
+        return rnd.scores[p] - score_before
+
+
+def run_rollouts(root, p, candidates, deadline, seed, max_rollouts=None):
+    # rollouts of every candidate discard in turn until the deadline, each on its own determinization.
+    # The deadline is wall clock time so processes of a pool share it, a rollout cut off by it doesn't count
+    rng = np.random.default_rng(seed)
+    totals = np.zeros(len(candidates))
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    i = 0
+    while time() < deadline and (max_rollouts is None or counts.sum() < max_rollouts):
+        rnd = root.clone()
+        rnd.rng = rng
+        rnd.determinize(p, rng)
+        score_change = rollout(rnd, p, candidates[i], deadline)
+        if score_change is None:
+            break
+        totals[i] += score_change
+        counts[i] += 1
+        i = (i + 1) % len(candidates)
+    return totals, counts
+
+
+# Searches every discard within a time budget: the heuristic's best candidates are played out to the end of the round
+# from sampled hidden hands by a cheap rollout player, the best average score change wins.
+# Other decisions are left to the rollout player.
+class RolloutSearchPlayer(Player):
+    def __init__(self, time_budget=1., max_candidates=4, processes=None, rollout_player: Player = None, seed=None,
+                 max_rollouts=None):
+        super().__init__(is_human=False, model=None)
+        self.time_budget = time_budget  # seconds per discard
+        self.max_rollouts = max_rollouts  # per discard and process, seeded searches that stop on it repeat exactly
+        self.max_candidates = max_candidates
+        self.processes = processes if processes is not None else os.cpu_count()  # 1 searches in this process
+        self.rollout_player = rollout_player if rollout_player is not None else HeuristicPlayer()
+        self.ranker = HeuristicPlayer()
+        self.rng = np.random.default_rng(seed)
+        self.pool: ProcessPoolExecutor | None = None
+
+        self.searches = 0
+        self.rollouts = 0
+        self.search_time = 0.
+
+    def decide(self, rnd, requests):
+        decisions = []
+        for p, possible_calls in requests:
+            if MoveType.DISCARD in possible_calls:
+                discard_tile_id34 = self.search_discard(rnd, p, possible_calls)
+                rnd.curr_player_id = p
+                decisions.append(rnd.choose_move(possible_calls, discard_tile_id34, 0, MoveType.DISCARD.value))
+            else:
+                decisions.extend(self.rollout_player.decide(rnd, [(p, possible_calls)]))
+        return decisions
+
+    def search_discard(self, rnd, p, possible_calls: list[MoveType]):
+        candidates = self.ranker.rank_discards(rnd, p, possible_calls)[:self.max_candidates]
+        if len(candidates) == 1:
+            return candidates[0]
+
+        start = perf_counter()
+        deadline = time() + self.time_budget  # everything below counts, starting the pool included
+        root = rnd.clone()
+        root.competitors = [self.rollout_player] * 4
+        seeds = self.rng.integers(2 ** 63, size=max(self.processes, 1))
+        if self.processes > 1:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(self.processes)
+            futures = [
+                self.pool.submit(run_rollouts, root, p, candidates, deadline, seed, self.max_rollouts)
+                for seed in seeds
+            ]
+            # workers still starting up by then are left out, they stop on their own once started
+            done, not_done = wait(futures, timeout=max(deadline + RESULT_SLACK - time(), 0.))
+            for future in not_done:
+                future.cancel()
+            results = [future.result() for future in done]
+        else:
+            results = [run_rollouts(root, p, candidates, deadline, seeds[0], self.max_rollouts)]
+        totals = sum((result[0] for result in results), np.zeros(len(candidates)))
+        counts = sum((result[1] for result in results), np.zeros(len(candidates), dtype=np.int64))
+
+        self.searches += 1
+        self.rollouts += int(counts.sum())
+        self.search_time += perf_counter() - start
+        if not counts.any():
+            return candidates[0]
+        # ties and unplayed candidates go to the heuristic's order
+        mean = np.where(counts > 0, totals / np.maximum(counts, 1), -np.inf)
+        return candidates[int(np.argmax(mean))]
+
+    def rollouts_per_second(self):
+        if not self.search_time:
+            return 0.
+        return self.rollouts / self.search_time
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -1,9 +1,54 @@
-from mahjong import shanten
+from functools import lru_cache
 from mahjong.meld import Meld
 
+from game.src.core.efficiency import efficiency_service
 
-def correct_shanten(tiles34: list[int], melds: list[Meld]):
+
+# Process-wide shanten calculator, memoized on the 34-count vector of a hand.
+# Counted as mahjong.shanten counts it, by the cached suit splits of the efficiency service.
+class ShantenService:
+    def __init__(self, maxsize=1 << 18):
+        self._calculate = lru_cache(maxsize=maxsize)(self._calculate_uncached)
+
+    def _calculate_uncached(self, key: bytes):
+        return efficiency_service.shanten(list(key))
+
+    def calculate(self, tiles34) -> int:
+        return self._calculate(bytes(tiles34))
+
+    def calculate_many(self, hands) -> list[int]:
+        calculate = self._calculate
+        return [calculate(bytes(tiles34)) for tiles34 in hands]
+
+    def stats(self):
+        info = self._calculate.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hit_rate": info.hits / lookups if lookups else 0.,
+        }
+
+    def clear(self):
+        self._calculate.cache_clear()
+
+
+shanten_service = ShantenService()
+
+
+def kan_corrected(tiles34: list[int], melds: list[Meld]):
+    # a kan counts as a single set of 3 tiles for shanten purposes
     for meld in melds:
         if meld.type == Meld.KAN or meld.type == Meld.SHOUMINKAN:
             tiles34[meld.tiles[0] // 4] -= 1
-    return shanten.Shanten().calculate_shanten(tiles34)
+    return tiles34
+
+
+def correct_shanten(tiles34: list[int], melds: list[Meld]):
+    return shanten_service.calculate(kan_corrected(tiles34, melds))
+
+
+def correct_shanten_many(hands: list[list[int]], melds: list[Meld]):
+    return shanten_service.calculate_many([kan_corrected(tiles34, melds) for tiles34 in hands])
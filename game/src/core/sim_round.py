@@ -0,0 +1,79 @@
+import numpy as np
+
+from game.src.core.round import Round
+from game.src.core.player import Player
+from game.src.core.mahjong_enums import MoveType
+from ml.src.data_structures import DataPoint
+
+
+# Headless round for self-play and model comparison: GUI, sound and delay hooks are no-ops
+class SimRound(Round):
+    def __init__(self, competitors: list[Player], scores, non_repeat_round_no, match_type, deck=None, rng=None,
+                 collect_data=False):
+        # collect_data: keep every model decision as a DataPoint labelled with the move made, as on replay
+        self.collect_data = collect_data
+        self.collected_data: list[DataPoint] = []
+        self.batch_features = None  # features of the batch being decided, kept for its datapoints
+        super().__init__(competitors, scores, non_repeat_round_no, match_type, gui=None, deck=deck, rng=rng)
+
+    def check_input(self):
+        if any(c.is_human for c in self.competitors):
+            raise ValueError("human competitors can't play a headless round")
+
+    def update_board(self, play_sound_name=None):
+        pass
+
+    def changed_curr_player_id(self):
+        pass
+
+    def delay(self, t=0.5, delay_human=False):
+        pass
+
+    def restrict_tiles(self, can_select_tiles):
+        pass
+
+    def lift_restriction_tiles(self):
+        pass
+
+    def show_scores(self, score_change, text):
+        pass
+
+    def load_features(self, requests: list[tuple[int, list[MoveType]]]):
+        features = super().load_features(requests)
+        if self.collect_data:
+            self.batch_features = features
+        return features
+
+    def choose_moves(self, requests: list[tuple[int, list[MoveType]]], choices):
+        decisions = super().choose_moves(requests, choices)
+        if self.collect_data:
+            # strategies deciding without a model never loaded the features
+            features = self.batch_features if self.batch_features is not None else super().load_features(requests)
+            for features, (_, possible_calls), decision in zip(features, requests, decisions):
+                self.collected_data.append(self.datapoint(features, possible_calls, decision))
+            self.batch_features = None
+        return decisions
+
+    @staticmethod
+    def datapoint(features: np.ndarray, possible_calls: list[MoveType], decision):
+        # labels only what was decided, the other heads are ignored like on replay
+        discard_tile, which_chi, take_action = decision
+        datapoint = DataPoint()
+        datapoint.features = features
+        if MoveType.DISCARD in possible_calls:
+            datapoint.load_labels(discard_tile, None, None)
+        else:
+            datapoint.load_labels(None, which_chi if take_action == MoveType.CHI else None, take_action)
+        return datapoint
+
+    def clone(self):
+        # the moves a clone plays are hypothetical, none of them are data
+        clone = super().clone()
+        clone.collect_data = False
+        clone.collected_data = []
+        clone.batch_features = None
+        return clone
+
+    def play(self):
+        scores, dealer_won, _ = yield from super().play()
+        return scores, dealer_won, self.collected_data
@@ -6,26 +6,58 @@ class Tile:
         ew sw ww nw
         wd gd rd
     """
+    NAMES = TILES.split()
 
-    def __init__(self, tile_id136):
-        self._id136 = tile_id136
+    # tiles are interned: Tile(id136) always returns the same immutable object
+    __slots__ = ("_id136", "_id34", "_suit", "_rank", "_is_red5", "_name", "_hash")
+    _pool: dict[int, "Tile"] = {}
+
+    def __new__(cls, tile_id136):
+        tile = cls._pool.get(tile_id136)
+        if tile is None:
+            tile_id136 = int(tile_id136)
+            tile = super().__new__(cls)
+            tile._id136 = tile_id136
+            tile._id34 = tile_id136 // 4
+            tile._suit = tile._id34 // 9  # 3 for honors
+            tile._rank = tile._id34 % 9
+            tile._is_red5 = tile._id34 < 27 and tile._rank == 4 and tile_id136 % 4 == 0
+            tile._name = Tile.NAMES[tile._id34]
+            tile._hash = hash(tile_id136)
+            cls._pool[tile_id136] = tile
+        return tile
+
+    @staticmethod
+    def of(tile_id136):
+        return Tile._pool[tile_id136]
 
     def id136(self):
         return self._id136
 
     def id34(self):
-        return self._id136 // 4
+        return self._id34
+
+    def suit(self):
+        return self._suit
+
+    def rank(self):
+        return self._rank
 
     def is_red5(self):
-        return self.id34() < 27 and self.id34() % 9 == 4 and self._id136 % 4 == 0
+        return self._is_red5
 
     def __str__(self):
-        return Tile.TILES.split()[self._id136 // 4]
+        return self._name
 
     def __eq__(self, other):
-        if type(other) != Tile:
-            return False
-        return self.id136() == other.id136()
+        return self is other
 
     def __hash__(self):
-        return hash(self.id136())
+        return self._hash
+
+    def __reduce__(self):
+        return Tile, (self._id136,)
+
+
+for _tile_id136 in range(34 * 4):
+    Tile(_tile_id136)
@@ -0,0 +1,13 @@
+from functools import lru_cache
+
+from game.src.core.agari_table import agari_waits
+
+
+@lru_cache(maxsize=1 << 16)
+def _wait_tiles(key: bytes, has_melds: bool):
+    return agari_waits(key, has_melds)
+
+
+# Exact wait tiles (machi) of a ready hand, by the shape of its closed part only - yaku are not checked
+def wait_tiles(closed34, has_melds: bool) -> tuple[int, ...]:
+    return _wait_tiles(bytes(closed34), has_melds)
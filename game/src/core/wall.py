@@ -0,0 +1,52 @@
+import numpy as np
+
+
+DECK_SIZE = 34 * 4
+
+
+# Shuffled decks of tile id136s, generated in batches as rows of a permutation matrix.
+# Seeded walls are reproducible and independent of the global random state and of other generators.
+class WallGenerator:
+    def __init__(self, seed: int | np.random.SeedSequence | None = None, batch_size=64):
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
+        self.batch_size = batch_size
+        self.decks = np.empty((0, DECK_SIZE), dtype=np.uint8)
+        self.next_deck_id = 0
+        self.dealt: list[np.ndarray] = []
+
+    @staticmethod
+    def from_decks(decks: np.ndarray):
+        # replays the given decks in order, then keeps generating from a fresh seed
+        walls = WallGenerator()
+        walls.decks = np.asarray(decks, dtype=np.uint8).reshape(-1, DECK_SIZE)
+        return walls
+
+    def generate(self, n):
+        # (n, 136) matrix, every row a permutation of all tile ids
+        return self.rng.permuted(np.tile(np.arange(DECK_SIZE, dtype=np.uint8), (n, 1)), axis=1)
+
+    def next_deck(self) -> np.ndarray:
+        if self.next_deck_id == len(self.decks):
+            self.decks = self.generate(self.batch_size)
+            self.next_deck_id = 0
+        deck = self.decks[self.next_deck_id]
+        self.next_deck_id += 1
+        self.dealt.append(deck)
+        return deck
+
+    def round_rng(self) -> np.random.Generator:
+        # independent stream for in-round randomness
+        return np.random.default_rng(self.seed_sequence.spawn(1)[0])
+
+    def save(self, path):
+        # every deck dealt so far, replayable with WallGenerator.from_decks(load_decks(path))
+        save_decks(path, np.array(self.dealt, dtype=np.uint8))
+
+
+def save_decks(path, decks: np.ndarray):
+    np.save(path, np.asarray(decks, dtype=np.uint8).reshape(-1, DECK_SIZE))
+
+
+def load_decks(path) -> np.ndarray:
+    return np.load(path)
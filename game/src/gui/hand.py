@@ -73,7 +73,7 @@ class Hand:
             for meld in melds:
                 for ti in meld.tiles:
                     self.open_tiles.add(
-                        tile_sprite.TileSprite(get_tile_position(i), tile_size, Tile(ti), self.rotation)
+                        tile_sprite.TileSprite(get_tile_position(i), tile_size, Tile.of(ti), self.rotation)
                     )
                     i += 1
 
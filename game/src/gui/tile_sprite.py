@@ -17,16 +17,17 @@ class TileSprite(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(center=self.position)
         self.inactive = False
 
+    TILE_NAMES = """
+        Man1 Man2 Man3 Man4 Man5 Man6 Man7 Man8 Man9
+        Pin1 Pin2 Pin3 Pin4 Pin5 Pin6 Pin7 Pin8 Pin9
+        Sou1 Sou2 Sou3 Sou4 Sou5 Sou6 Sou7 Sou8 Sou9
+        EastWind SouthWind WestWind NorthWind
+        WhiteDragon GreenDragon RedDragon
+    """.split()
+
     @staticmethod
     def get_tile_name(tile_id):
-        tile_names = """
-            Man1 Man2 Man3 Man4 Man5 Man6 Man7 Man8 Man9
-            Pin1 Pin2 Pin3 Pin4 Pin5 Pin6 Pin7 Pin8 Pin9
-            Sou1 Sou2 Sou3 Sou4 Sou5 Sou6 Sou7 Sou8 Sou9
-            EastWind SouthWind WestWind NorthWind
-            WhiteDragon GreenDragon RedDragon
-        """
-        return tile_names.split()[tile_id // 4]
+        return TileSprite.TILE_NAMES[tile_id // 4]
     
     def __get_tile_img(self):
         if self.hidden:
@@ -1,7 +1,9 @@
 from .extract_datapoints import extract_datapoints
 from .refine_data import refine_data
+from .self_play import self_play_datapoints
 
 __all__ = [
     "extract_datapoints",
     "refine_data",
+    "self_play_datapoints",
 ]
@@ -31,7 +31,7 @@ def decode_chi(data, move_info: MoveData):
     called = base_and_called % 3
     base = base_and_called // 3
     base = (base // 7) * 9 + base % 7
-    tiles = Tile(t0 + 4 * (base + 0)), Tile(t1 + 4 * (base + 1)), Tile(t2 + 4 * (base + 2))
+    tiles = Tile.of(t0 + 4 * (base + 0)), Tile.of(t1 + 4 * (base + 1)), Tile.of(t2 + 4 * (base + 2))
 
     move_info.move_type = MoveType.CHI
     move_info.tile = tiles[called]
@@ -45,10 +45,10 @@ def decode_pon(data, move_info: MoveData):
     called = base_and_called % 3
     base = base_and_called // 3
     if data & 0x8:
-        tiles = Tile(t0 + 4 * base), Tile(t1 + 4 * base), Tile(t2 + 4 * base)
+        tiles = Tile.of(t0 + 4 * base), Tile.of(t1 + 4 * base), Tile.of(t2 + 4 * base)
         move_info.move_type = MoveType.PON
     else:
-        tiles = Tile(t0 + 4 * base), Tile(t1 + 4 * base), Tile(t2 + 4 * base), Tile(t4 + 4 * base)
+        tiles = Tile.of(t0 + 4 * base), Tile.of(t1 + 4 * base), Tile.of(t2 + 4 * base), Tile.of(t4 + 4 * base)
         move_info.move_type = MoveType.KAN  # or more specifically, chakan
     move_info.tile = tiles[called]
     move_info.base = tiles
@@ -58,7 +58,7 @@ def decode_kan(data, move_info: MoveData):
     base_and_called = data >> 8
     base = base_and_called // 4
     called = base_and_called % 4
-    tiles = Tile(4 * base), Tile(1 + 4 * base), Tile(2 + 4 * base), Tile(3 + 4 * base)
+    tiles = Tile.of(4 * base), Tile.of(1 + 4 * base), Tile.of(2 + 4 * base), Tile.of(3 + 4 * base)
 
     move_info.move_type = MoveType.KAN
     move_info.tile = tiles[called]
@@ -98,9 +98,9 @@ def parse_match_log(log_raw, min_dan=16) -> MatchData | None:
                         return None
 
             case "INIT":  # start round
-                new_round = RoundData(int(event.attrib["oya"]), Tile(int(event.attrib["seed"][-1])))
+                new_round = RoundData(int(event.attrib["oya"]), Tile.of(int(event.attrib["seed"][-1])))
                 for i in range(4):
-                    new_round.init_hands[i] = [Tile(int(t)) for t in event.attrib["hai{}".format(i)].split(',')]
+                    new_round.init_hands[i] = [Tile.of(int(t)) for t in event.attrib["hai{}".format(i)].split(',')]
                 match_info.round_data.append(new_round)
 
             case "N":  # call
@@ -128,7 +128,7 @@ def parse_match_log(log_raw, min_dan=16) -> MatchData | None:
                 # tile None base []
 
             case "DORA":  # dora revealed (after kan)
-                match_info.round_data[-1].moves[-1].dora_revealed_ind = Tile(int(event.attrib["hai"]))
+                match_info.round_data[-1].moves[-1].dora_revealed_ind = Tile.of(int(event.attrib["hai"]))
 
             case "AGARI":  # round finishes with someone winning
                 new_move = MoveData()
@@ -142,29 +142,29 @@ def parse_match_log(log_raw, min_dan=16) -> MatchData | None:
                 match_info.round_data[-1].score_before = [int(score) for score in event.attrib["sc"].split(',')][::2]
                 match_info.round_data[-1].score_change = [int(score) for score in event.attrib["sc"].split(',')][1::2]
                 if "doraHai" in event.attrib.keys():
-                    match_info.round_data[-1].uradora = [Tile(int(t)) for t in event.attrib["doraHai"].split(',')]
+                    match_info.round_data[-1].uradora = [Tile.of(int(t)) for t in event.attrib["doraHai"].split(',')]
                 if "doraHaiUra" in event.attrib.keys():
-                    match_info.round_data[-1].uradora += [Tile(int(t)) for t in event.attrib["doraHaiUra"].split(',')]
+                    match_info.round_data[-1].uradora += [Tile.of(int(t)) for t in event.attrib["doraHaiUra"].split(',')]
 
             case "RYUUKYOKU":  # round finishes with a draw
                 match_info.round_data[-1].score_before = [int(score) for score in event.attrib["sc"].split(',')][::2]
                 match_info.round_data[-1].score_change = [int(score) for score in event.attrib["sc"].split(',')][1::2]
                 if "doraHai" in event.attrib.keys():
-                    match_info.round_data[-1].uradora = [Tile(int(t)) for t in event.attrib["doraHai"].split(',')]
+                    match_info.round_data[-1].uradora = [Tile.of(int(t)) for t in event.attrib["doraHai"].split(',')]
                 if "doraHaiUra" in event.attrib.keys():
-                    match_info.round_data[-1].uradora += [Tile(int(t)) for t in event.attrib["doraHaiUra"].split(',')]
+                    match_info.round_data[-1].uradora += [Tile.of(int(t)) for t in event.attrib["doraHaiUra"].split(',')]
 
             case _:
                 if draw_regex.search(event.tag):  # draw tile
                     new_move = MoveData()
                     new_move.move_type = MoveType.DRAW
-                    new_move.tile = Tile(int(event.tag[1:]))
+                    new_move.tile = Tile.of(int(event.tag[1:]))
                     new_move.player_id = ord(event.tag[0]) - ord("T")
                     match_info.round_data[-1].moves.append(new_move)
                 elif discard_regex.search(event.tag):  # discard tile
                     new_move = MoveData()
                     new_move.move_type = MoveType.DISCARD
-                    new_move.tile = Tile(int(event.tag[1:]))
+                    new_move.tile = Tile.of(int(event.tag[1:]))
                     new_move.player_id = ord(event.tag[0]) - ord("D")
                     match_info.round_data[-1].moves.append(new_move)
 
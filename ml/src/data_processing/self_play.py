@@ -0,0 +1,27 @@
+import random
+import math
+
+from ml.src.data_structures import DataPoint
+from ml.src.data_structures.dataset import DataSet
+from game.src.core.player import Player
+from game.src.core.lockstep import LockstepRounds, run_matches
+
+
+def self_play_datapoints(competitors: list[Player], raw_data_filename, how_many=1000, chunk_size=100, init_seed=0):
+    # model vs model matches, every model decision saved with the move made, in the layout DataSet reads
+    n_chunks = math.ceil(how_many / chunk_size)
+    print(f"Playing {how_many} matches in {n_chunks} chunks")
+
+    rand = random.Random(init_seed)
+    lockstep = LockstepRounds()
+    for chunk_i in range(n_chunks):
+        play_how_many = min(chunk_size, how_many - chunk_i * chunk_size)
+        seeds = [rand.randint(1, 2 ** 31) for _ in range(play_how_many)]
+        datapoints: list[DataPoint] = []
+        for _, data in run_matches([competitors] * play_how_many, seeds, lockstep=lockstep, collect_data=True):
+            datapoints.extend(data)
+
+        print(f"Chunk {chunk_i+1}/{n_chunks}: {len(datapoints)} datapoints from {play_how_many} matches "
+              f"({lockstep.rounds_per_second():.1f} rounds/s)")
+        DataSet.save_batch(datapoints, raw_data_filename)
+        print(f"Chunk {chunk_i+1}/{n_chunks}: saved")
@@ -28,3 +28,5 @@ class MatchData:
     def __init__(self):
         self.round_data: list[RoundData] = []
         self.prevalent_wind = mc.EAST
+        self.match_id: int | None = None  # set for recorded matches, index among the matches played together
+        self.seed: int | None = None  # set for recorded matches played on seeded walls
@@ -1,21 +1,25 @@
 import random
 from operator import add
 
-from game.src.core.match import run_match
+from game.src.core.lockstep import LockstepRounds, run_matches
 
 
 def versus(competitors, how_many, init_seed, device):
 
     total = [0, 0, 0, 0]
+    lockstep = LockstepRounds()
     for match in range(how_many):
         seed = random.randint(1717, 7171) if match else init_seed
         match_total = [0, 0, 0, 0]
         print("Match {} seed {}".format(match, seed))
-        for order in range(4):
-            scores, _ = run_match(competitors[order:] + competitors[:order], seed, device)
+        # every seat rotation plays the same walls, all four in lockstep
+        lineups = [competitors[order:] + competitors[:order] for order in range(4)]
+        results = run_matches(lineups, [seed] * 4, lockstep=lockstep)
+        for order, (scores, _) in enumerate(results):
             scores = scores[-order:] + scores[:-order]
             match_total = list(map(add, match_total, scores))
             print("Match {} var {} completed with scores {}".format(match, order, scores))
         total = list(map(add, total, match_total))
+        print("Simulated {} rounds at {:.1f} rounds/s".format(lockstep.rounds_played, lockstep.rounds_per_second()))
 
     return [total[i] / sum(total) for i in range(4)]
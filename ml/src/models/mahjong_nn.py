@@ -37,11 +37,15 @@ class MahjongNN(nn.Module):
 
         return [head(x) for head in self.heads]
 
-    def get_prediction(self, input_vector: torch.Tensor):
-        y_preds = self(input_vector.unsqueeze(0))
+    def get_choices(self, input_matrix: torch.Tensor, masks: list[torch.Tensor]):
+        with torch.no_grad():
+            y_preds = self(input_matrix.to(self.device))
 
-        # probabilities for discard_tiles, which_chi, action
-        return [torch.softmax(y_pred, dim=1)[0] for y_pred in y_preds]
+            # (batch,) index of the most likely legal option per head, softmax doesn't change the argmax
+            return [
+                y_pred.masked_fill(~mask.to(self.device), -torch.inf).argmax(dim=1)
+                for y_pred, mask in zip(y_preds, masks)
+            ]
 
     def train_model(self, dataset: DataSet, epochs_no=5):
         criterions = [
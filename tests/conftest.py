@@ -0,0 +1,11 @@
+import pytest
+import torch
+
+from ml.src.models.mahjong_nn import MahjongNN
+
+
+@pytest.fixture(scope="session")
+def model():
+    # untrained but seeded, so its games are the same on every run
+    torch.manual_seed(0)
+    return MahjongNN(3, 64, torch.device("cpu"))
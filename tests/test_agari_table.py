@@ -0,0 +1,88 @@
+import numpy as np
+from mahjong.agari import Agari
+
+from game.src.core.agari_table import ORPHAN_INDICES, is_agari
+from game.src.core.waits import wait_tiles
+
+library = Agari()
+
+
+def complete_hand(rng, n_sets):
+    counts = [0] * 34
+    while n_sets:
+        if rng.random() < .4:
+            tile_id34 = rng.integers(34)
+            if counts[tile_id34] <= 1:
+                counts[tile_id34] += 3
+                n_sets -= 1
+        else:
+            tile_id34 = rng.integers(3) * 9 + rng.integers(7)
+            if all(counts[tile_id34 + i] < 4 for i in range(3)):
+                for i in range(3):
+                    counts[tile_id34 + i] += 1
+                n_sets -= 1
+    while True:
+        tile_id34 = rng.integers(34)
+        if counts[tile_id34] <= 2:
+            counts[tile_id34] += 2
+            return counts
+
+
+def special_hand(rng):
+    counts = [0] * 34
+    if rng.random() < .5:
+        for tile_id34 in rng.choice(34, 7, replace=False):
+            counts[tile_id34] = 2
+    else:
+        for tile_id34 in ORPHAN_INDICES:
+            counts[tile_id34] = 1
+        counts[rng.choice(ORPHAN_INDICES)] += 1
+    return counts
+
+
+def hands_with_melds(seed, n):
+    # (closed part, whole hand, melds): complete hands, half of them with one tile swapped out.
+    # Melds are honor pons of kinds the closed part doesn't hold
+    rng = np.random.default_rng(seed)
+    hands = []
+    while len(hands) < n:
+        n_melds = rng.choice([0, 0, 0, 1, 2, 3, 4])
+        closed = special_hand(rng) if n_melds == 0 and rng.random() < .15 else complete_hand(rng, 4 - n_melds)
+        free = [i for i in range(27, 34) if closed[i] == 0][:n_melds]
+        if len(free) < n_melds:
+            continue
+        full = closed.copy()
+        for i in free:
+            full[i] = 3
+        if rng.random() < .5:
+            out = rng.choice([i for i in range(34) if closed[i]])
+            into = rng.integers(34)
+            closed[out] -= 1
+            full[out] -= 1
+            if full[into] < 4:
+                closed[into] += 1
+                full[into] += 1
+        hands.append((closed, full, [[i] * 3 for i in free]))
+    return hands
+
+
+def test_is_agari_matches_the_library():
+    for closed, full, melds in hands_with_melds(0, 5000):
+        assert is_agari(closed, bool(melds)) == library.is_agari(full, melds), (closed, melds)
+
+
+def test_wait_tiles_match_the_library():
+    rng = np.random.default_rng(1)
+    for closed, full, melds in hands_with_melds(2, 3000):
+        out = rng.choice([i for i in range(34) if closed[i]])
+        closed[out] -= 1
+        full[out] -= 1
+        expected = []
+        for tile_id34 in range(34):
+            if full[tile_id34] < 4:
+                full[tile_id34] += 1
+                if library.is_agari(full, melds):
+                    expected.append(tile_id34)
+                full[tile_id34] -= 1
+        waits = [tile_id34 for tile_id34 in wait_tiles(closed, bool(melds)) if full[tile_id34] < 4]
+        assert waits == expected, (closed, melds)
@@ -0,0 +1,54 @@
+import numpy as np
+from mahjong.shanten import Shanten
+
+from game.src.core.efficiency import efficiency_service
+from game.src.core.shanten import shanten_service
+
+library = Shanten()
+
+
+def random_hands(seed, n, sizes=(13, 14)):
+    rng = np.random.default_rng(seed)
+    return [np.bincount(rng.permutation(136)[:rng.choice(sizes)] // 4, minlength=34) for _ in range(n)]
+
+
+def one_suit_heavy_hands(seed, n):
+    # most tiles from six kinds of one suit, so the hands sit close to ready and hold triplets and quads
+    rng = np.random.default_rng(seed)
+    hands = []
+    for _ in range(n):
+        counts = np.zeros(34, dtype=np.int64)
+        kinds = rng.choice(9, 6) + 9 * rng.integers(3)
+        for tile_id34 in rng.choice(kinds, 14):
+            counts[tile_id34] = min(counts[tile_id34] + 1, 4)
+        while counts.sum() < 13:
+            tile_id34 = rng.integers(34)
+            counts[tile_id34] = min(counts[tile_id34] + 1, 4)
+        hands.append(counts)
+    return hands
+
+
+def test_shanten_matches_the_library():
+    for counts in random_hands(0, 2000) + one_suit_heavy_hands(1, 1000):
+        expected = library.calculate_shanten(counts.tolist())
+        assert efficiency_service.shanten(counts) == expected, counts.tolist()
+        assert shanten_service.calculate(counts.tolist()) == expected, counts.tolist()
+
+
+def test_discard_efficiency_matches_the_library():
+    for counts in random_hands(2, 40, (14,)) + one_suit_heavy_hands(3, 40):
+        hidden = 4 - counts
+        efficiency = efficiency_service.discard_efficiency(counts, 0, hidden)
+        assert efficiency.discards.tolist() == np.flatnonzero(counts).tolist()
+        for discard, shanten, improving, live in zip(*efficiency):
+            hand = counts.copy()
+            hand[discard] -= 1
+            expected = library.calculate_shanten(hand.tolist())
+            expected_improving = np.zeros(34, dtype=np.bool_)
+            for tile_id34 in np.flatnonzero(hand < 4):
+                hand[tile_id34] += 1
+                expected_improving[tile_id34] = library.calculate_shanten(hand.tolist()) < expected
+                hand[tile_id34] -= 1
+            assert shanten == expected
+            assert (improving == expected_improving).all(), (hand.tolist(), discard)
+            assert live == hidden[expected_improving].sum()
@@ -0,0 +1,24 @@
+from game.src.core.player import Player
+from game.src.core.heuristic_player import HeuristicPlayer
+from game.src.core.match import run_match
+from game.src.core.lockstep import LockstepRounds, run_matches
+from game.src.core.sim_round import SimRound
+from game.src.core.wall import WallGenerator
+
+
+def test_lockstep_matches_play_out_as_run_match(model):
+    seeds = [3, 5, 8, 13]
+    lineups = [[Player(model=model)] * 4, [HeuristicPlayer()] * 4, [Player(model=model), HeuristicPlayer()] * 2,
+               [Player(model=model)] * 4]
+    results = run_matches(lineups, seeds)
+    for competitors, seed, (scores, _) in zip(lineups, seeds, results):
+        assert run_match(competitors, seed)[0] == scores
+
+
+def test_time_spent_counts_adding_rounds():
+    walls = WallGenerator(1)
+    lockstep = LockstepRounds()
+    lockstep.add(0, SimRound([HeuristicPlayer()] * 4, [250] * 4, 0, 0, walls.next_deck(), walls.round_rng()))
+    assert lockstep.time_spent > 0
+    lockstep.run()
+    assert lockstep.rounds_played == 1
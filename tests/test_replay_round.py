@@ -0,0 +1,79 @@
+from functools import partialmethod
+from types import SimpleNamespace
+
+import numpy as np
+
+from game.src.core.player import Player
+from game.src.core.heuristic_player import HeuristicPlayer
+from game.src.core.match import run_match
+from game.src.core.lockstep import run_matches
+from game.src.core.game_record import GameRecordWriter, GameRecordReader
+from game.src.core.replay_round import ReplayRound
+from game.src.core.mahjong_enums import MoveType
+from ml.src.data_structures import MoveData
+
+
+def final_scores(match_data):
+    last = match_data.round_data[-1]
+    return [before + change for before, change in zip(last.score_before, last.score_change)]
+
+
+def test_recorded_matches_replay_to_their_scores(model, tmp_path):
+    # kan replacement draws past turn 70 come from the log too
+    path = tmp_path / "games.rec"
+    seeds = list(range(1, 13))
+    with GameRecordWriter(path) as writer:
+        results = run_matches([[Player(model=model)] * 4] * len(seeds), seeds, recorder=writer)
+
+    reader = GameRecordReader(path)
+    assert len(reader) == len(seeds)
+    # written as they finish, told apart by the match id
+    assert sorted(match_data.match_id for match_data in reader) == list(range(len(seeds)))
+    for match_data in reader:
+        assert match_data.seed == seeds[match_data.match_id]
+        assert final_scores(match_data) == results[match_data.match_id][0]
+        assert run_match(None, match_replay=match_data)[0] == final_scores(match_data)
+
+
+def test_recorded_seed_plays_the_match_again(model, tmp_path):
+    path = tmp_path / "games.rec"
+    seed = (1 << 40) + (1 << 31) + 5
+    with GameRecordWriter(path) as writer:
+        scores, _ = run_match([Player(model=model)] * 4, seed, recorder=writer)
+
+    match_data, = GameRecordReader(path)
+    assert match_data.match_id is None and match_data.seed == seed
+    assert run_match([Player(model=model)] * 4, match_data.seed)[0] == scores
+
+
+def test_logged_call_is_taken_by_the_seat_that_made_it():
+    move = MoveData()
+    move.move_type = MoveType.PON
+    deciding = SimpleNamespace(curr_player_id=2)
+
+    move.player_id = 2
+    assert ReplayRound.moved_by_deciding_seat(deciding, move)
+    move.player_id = 1
+    assert not ReplayRound.moved_by_deciding_seat(deciding, move)
+    move.player_id = None  # logs without seats
+    assert ReplayRound.moved_by_deciding_seat(deciding, move)
+
+
+def test_fast_forward_replays_give_the_same_data(model, tmp_path, monkeypatch):
+    path = tmp_path / "games.rec"
+    seeds = list(range(1, 7))
+    lineups = [[Player(model=model)] * 4, [HeuristicPlayer()] * 4] * (len(seeds) // 2)
+    with GameRecordWriter(path) as writer:
+        run_matches(lineups, seeds, recorder=writer)
+
+    reader = GameRecordReader(path)
+    fast = [run_match(None, match_replay=match_data, collect_data=True) for match_data in reader]
+    monkeypatch.setattr(ReplayRound, "__init__", partialmethod(ReplayRound.__init__, fast_forward=False))
+    slow = [run_match(None, match_replay=match_data, collect_data=True) for match_data in reader]
+
+    for (fast_scores, fast_data), (slow_scores, slow_data) in zip(fast, slow):
+        assert fast_scores == slow_scores
+        assert len(fast_data) == len(slow_data) > 0
+        for fast_point, slow_point in zip(fast_data, slow_data):
+            assert np.array_equal(fast_point.features, slow_point.features)
+            assert np.array_equal(fast_point.labels, slow_point.labels)
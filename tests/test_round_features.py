@@ -0,0 +1,56 @@
+import numpy as np
+
+from game.src.core.heuristic_player import HeuristicPlayer
+from game.src.core.sim_round import SimRound
+from game.src.core.wall import WallGenerator
+from game.src.core.mahjong_enums import MoveType
+
+
+def one_hot(i, n):
+    arr = np.zeros(n)
+    if i is not None:
+        arr[i] = 1
+    return arr
+
+
+def reference_features(rnd, p, possible_calls):
+    # the row as it used to be built: every block concatenated from the round's arrays, rolled to seat p
+    tile_to_call = None
+    tile_origin = None
+    if any(2 <= pc.value <= 7 for pc in possible_calls):
+        tile_to_call = rnd.tile.id34()
+        tile_origin = rnd.event.from_who if rnd.event.from_who is not None else rnd.event.who
+
+    def rolled(arr):
+        return np.ravel(np.roll(arr, -p, axis=0))
+
+    return np.concatenate((
+        [rnd.round_no], [rnd.turn_no], rolled(one_hot(rnd.dealer_id, 4)), one_hot(rnd.prevalent_wind, 4),
+        one_hot(rnd.seat_wind[p], 4), rnd.closed_hand_counts[p], rolled(rnd.open_hand_counts),
+        rolled(rnd.discard_orders), rnd.hidden_tile_counts[p], rnd.visible_dora, rolled(rnd.hand_is_closed),
+        rolled(rnd.hand_in_riichi), rolled(rnd.scores), rnd.red5_closed_hand[p], rolled(rnd.red5_open_hand),
+        rnd.red5_discarded, rnd.red5_hidden[p], one_hot(tile_to_call, 34), rolled(one_hot(tile_origin, 4)),
+    ), dtype=np.float32)
+
+
+def test_gathered_rows_match_the_reference():
+    walls = WallGenerator(9)
+    heuristic = HeuristicPlayer()
+    rows = 0
+    for k in range(6):
+        rnd = SimRound([heuristic] * 4, [250 - 7 * k, 250, 250 + 3 * k, 250], k % 4, k % 2,
+                       walls.next_deck(), walls.round_rng())
+        game = rnd.play()
+        try:
+            requests, target_tile = next(game)
+            while True:
+                for possible_calls in ([MoveType.DISCARD], [MoveType.PASS, MoveType.PON], requests[0][1]):
+                    features = rnd.load_features([(p, possible_calls) for p in range(4)])
+                    for p, row in enumerate(features):
+                        expected = reference_features(rnd, p, possible_calls)
+                        assert row.dtype == expected.dtype and np.array_equal(row, expected)
+                        rows += 1
+                requests, target_tile = game.send(rnd.decide_many(requests, target_tile))
+        except StopIteration:
+            pass
+    assert rows > 1000
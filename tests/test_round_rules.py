@@ -0,0 +1,67 @@
+import numpy as np
+from mahjong.meld import Meld
+
+from game.src.core.player import Player
+from game.src.core.sim_round import SimRound
+from game.src.core.mahjong_enums import MoveType
+
+
+def round_dealt(dealer_hand, *dealer_draws):
+    # the dealer (seat 0) gets dealer_hand and the first wall tiles are dealer_draws, every other tile keeps its
+    # order. After a closed kan the dealer draws on from the wall
+    rest = [t for t in range(136) if t not in dealer_hand and t not in dealer_draws]
+    deck = dealer_hand + rest[:39] + list(dealer_draws) + rest[39:]
+    return SimRound(
+        [Player() for _ in range(4)], [250] * 4, 0, 0, np.array(deck, dtype=np.uint8), np.random.default_rng(0)
+    )
+
+
+def first_requests(rnd):
+    requests, _ = next(rnd.play())
+    return requests
+
+
+def test_nine_orphans_draw_needs_nine_kinds():
+    # 1m 9m 1p 9p 1s 9s E S W
+    nine_kinds = [0, 32, 36, 68, 72, 104, 108, 112, 116, 40, 44, 48, 92]
+    assert first_requests(round_dealt(nine_kinds, 96)) == [(0, [MoveType.PASS, MoveType.DRAW])]
+
+
+def test_nine_orphan_tiles_of_eight_kinds_are_not_enough():
+    # 1m 9m 1p 9p 1s 9s 9s E S: nine tiles, eight kinds
+    eight_kinds = [0, 32, 36, 68, 72, 104, 105, 108, 112, 40, 44, 48, 92]
+    assert first_requests(round_dealt(eight_kinds, 96)) == [(0, [MoveType.DISCARD])]
+
+
+def test_no_fifth_kan():
+    four_of_2m = [4, 5, 6, 7, 36, 48, 60, 72, 84, 108, 112, 116, 120]
+    rnd = round_dealt(four_of_2m, 96)
+    assert first_requests(rnd) == [(0, [MoveType.PASS, MoveType.KAN])]
+
+    rnd = round_dealt(four_of_2m, 96)
+    for seat, tile_id34 in ((1, 26), (1, 31), (2, 32), (3, 33)):
+        rnd.melds[seat].append(Meld(
+            meld_type=Meld.KAN, tiles=list(range(tile_id34 * 4, tile_id34 * 4 + 4)), opened=False, who=seat
+        ))
+    assert not rnd.is_kan_left()
+    assert first_requests(rnd) == [(0, [MoveType.DISCARD])]
+
+
+def test_closed_kan_of_a_quad_held_since_the_deal():
+    four_chun = [132, 133, 134, 135, 0, 12, 24, 36, 48, 60, 72, 84, 108]
+    rnd = round_dealt(four_chun, 96)
+    game = rnd.play()
+    next(game)
+    game.send([(None, None, MoveType.KAN)])
+    assert [meld.tiles for meld in rnd.melds[0]] == [four_chun[:4]]
+    assert rnd.closed_hand_counts[0][96 // 4] == 1
+
+
+def test_no_riichi_when_only_a_kan_tile_keeps_the_hand_ready():
+    # 2m2m 6m7m 6p7p8p 3s3s 5s5s and a closed kan of 4s: shanten takes the kan for 444s and finds the hand ready,
+    # but only letting go of a 4s would keep it so
+    rnd = round_dealt([84, 85, 86, 87, 4, 5, 20, 24, 56, 60, 64, 80, 81], 89, 90)
+    game = rnd.play()
+    next(game)
+    requests, _ = game.send([(None, None, MoveType.KAN)])
+    assert requests == [(0, [MoveType.DISCARD])]
@@ -0,0 +1,43 @@
+from time import perf_counter
+
+from game.src.core.heuristic_player import HeuristicPlayer
+from game.src.core.search_player import RolloutSearchPlayer, RESULT_SLACK
+from game.src.core.sim_round import SimRound
+from game.src.core.wall import WallGenerator
+
+
+def play_rounds(searcher, seed, n):
+    walls = WallGenerator(seed)
+    competitors = [searcher, HeuristicPlayer(), HeuristicPlayer(), HeuristicPlayer()]
+    return [
+        SimRound(competitors, [250] * 4, 0, 0, walls.next_deck(), walls.round_rng()).run()[0] for _ in range(n)
+    ]
+
+
+def test_seeded_search_plays_full_rounds_reproducibly():
+    # rollouts run from determinized clones, kans with quads dealt to them included
+    first = play_rounds(RolloutSearchPlayer(time_budget=60., processes=1, seed=0, max_rollouts=4), 6, 2)
+    again = play_rounds(RolloutSearchPlayer(time_budget=60., processes=1, seed=0, max_rollouts=4), 6, 2)
+    assert first == again
+
+
+def test_pool_search_keeps_to_its_time_budget():
+    searcher = RolloutSearchPlayer(time_budget=0.1, processes=2, seed=0)
+    slowest = 0.
+
+    search_discard = searcher.search_discard
+    def timed_search(*args):
+        nonlocal slowest
+        start = perf_counter()
+        try:
+            return search_discard(*args)
+        finally:
+            slowest = max(slowest, perf_counter() - start)
+    searcher.search_discard = timed_search
+
+    try:
+        play_rounds(searcher, 9, 1)
+    finally:
+        searcher.close()
+    assert searcher.searches > 0
+    assert slowest < searcher.time_budget + RESULT_SLACK + 0.1